@@ -0,0 +1,244 @@
+"""
+Alert rule engine for TrendLytix
+Configurable alert rules stored in SQLite and evaluated by triggers, so each
+snapshot, history point or forecast write re-runs only the rules for its topic
+
+Rule kinds:
+    threshold: the current snapshot's trend_score (0-1) against threshold
+    delta: change in trend_score since the topic's previous snapshot
+    forecast: the latest history score (0-100) and the stored forecast at
+        horizon lie on opposite sides of threshold; '>' raises on an upward
+        crossing, '<' on a downward one
+
+Every rule may be limited to one domain and one trend direction (the
+snapshot's trend_direction, or the forecast's trend for forecast rules).
+Messages may contain {topic}.
+"""
+
+import json
+import os
+from typing import Dict, List
+
+# JSON file with a list of rules, applied on startup over rules of the same name
+ALERT_RULES_FILE = os.getenv("TRENDLYTIX_ALERT_RULES", "")
+
+DEFAULT_ALERT_RULES = [
+    {'name': 'spike', 'kind': 'threshold', 'priority': 'high', 'direction': 'rising',
+     'operator': '>', 'threshold': 0.7, 'message': 'Rapid growth detected for {topic}'},
+    {'name': 'decline', 'kind': 'threshold', 'priority': 'medium', 'direction': 'falling',
+     'operator': '<', 'threshold': 0.3, 'message': 'Declining interest in {topic}'},
+]
+
+RULE_COLUMNS = (
+    "name", "kind", "alert_type", "priority", "operator", "threshold",
+    "direction", "domain", "horizon", "message", "enabled"
+)
+
+RULE_DEFAULTS = {'priority': 'medium', 'direction': None, 'domain': None, 'horizon': 'week', 'enabled': 1}
+
+
+def _compare(value: str) -> str:
+    """SQL condition comparing value with the rule's threshold"""
+    return f"CASE r.operator WHEN '>' THEN {value} > r.threshold WHEN '<' THEN {value} < r.threshold END"
+
+
+# Value snapshot rules compare, for the current snapshot l
+SNAPSHOT_VALUE = """CASE r.kind
+    WHEN 'threshold' THEN l.trend_score
+    WHEN 'delta' THEN l.trend_score - (
+        SELECT s.trend_score FROM trend_snapshot s
+        WHERE s.topic = l.topic
+        AND (s.computed_at < l.computed_at OR (s.computed_at = l.computed_at AND s.id < l.id))
+        ORDER BY s.computed_at DESC, s.id DESC
+        LIMIT 1
+    )
+END"""
+
+SNAPSHOT_MATCH = f"""
+    r.enabled AND r.kind IN ('threshold', 'delta')
+    AND (r.domain IS NULL OR r.domain = l.domain)
+    AND (r.direction IS NULL OR r.direction = l.trend_direction)
+    AND {_compare(SNAPSHOT_VALUE)}
+"""
+
+# Forecast at the rule's horizon, and the latest history score, for forecast p
+FORECAST_VALUE = """CASE r.horizon
+    WHEN 'tomorrow' THEN p.prediction_tomorrow
+    WHEN 'month' THEN p.prediction_month
+    ELSE p.prediction_week
+END"""
+LATEST_SCORE = """(
+    SELECT h.trend_score FROM trend_history h
+    WHERE h.topic = p.topic
+    ORDER BY h.recorded_ts DESC
+    LIMIT 1
+)"""
+
+FORECAST_MATCH = f"""
+    r.enabled AND r.kind = 'forecast'
+    AND (r.domain IS NULL OR r.domain = p.domain)
+    AND (r.direction IS NULL OR r.direction = p.trend)
+    AND CASE r.operator
+        WHEN '>' THEN {LATEST_SCORE} <= r.threshold AND {FORECAST_VALUE} > r.threshold
+        WHEN '<' THEN {LATEST_SCORE} >= r.threshold AND {FORECAST_VALUE} < r.threshold
+    END
+"""
+
+# Rule groups: (kinds, source table, its alias, match condition, alert timestamp)
+SNAPSHOT_RULES = (('threshold', 'delta'), "trend_latest", "l", SNAPSHOT_MATCH, "l.computed_at")
+FORECAST_RULES = (('forecast',), "trend_predictions", "p", FORECAST_MATCH, "p.trained_at")
+
+
+def _raise_alerts(group: tuple, condition: str) -> str:
+    """INSERT raising the group's matching alerts, keeping those already raised"""
+    _, table, alias, match, created_at = group
+    return f"""
+        INSERT INTO alerts (topic, rule_id, alert_type, priority, message, created_at)
+        SELECT {alias}.topic, r.id, r.alert_type, r.priority,
+               REPLACE(r.message, '{{topic}}', {alias}.topic), {created_at}
+        FROM {table} {alias} JOIN alert_rules r
+        WHERE {condition} AND {match}
+        ON CONFLICT (topic, rule_id) DO NOTHING
+    """
+
+
+def _refresh_topic(group: tuple, topic: str) -> str:
+    """Trigger body re-running one group's rules for one topic"""
+    kinds, table, alias, match, _ = group
+    kinds_sql = ", ".join(f"'{kind}'" for kind in kinds)
+    return f"""
+        DELETE FROM alerts
+        WHERE topic = {topic}
+        AND rule_id IN (SELECT id FROM alert_rules WHERE kind IN ({kinds_sql}))
+        AND NOT EXISTS (
+            SELECT 1 FROM {table} {alias} JOIN alert_rules r ON r.id = alerts.rule_id
+            WHERE {alias}.topic = alerts.topic AND {match}
+        );
+        {_raise_alerts(group, f"{alias}.topic = {topic}")};
+    """
+
+
+def create_alert_schema(cursor):
+    """Create the alert_rules and alerts tables and the triggers evaluating them"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alert_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL CHECK (kind IN ('threshold', 'delta', 'forecast')),
+            alert_type TEXT NOT NULL,
+            priority TEXT NOT NULL DEFAULT 'medium',
+            operator TEXT NOT NULL CHECK (operator IN ('>', '<')),
+            threshold REAL NOT NULL,
+            direction TEXT,
+            domain TEXT,
+            horizon TEXT NOT NULL DEFAULT 'week' CHECK (horizon IN ('tomorrow', 'week', 'month')),
+            message TEXT NOT NULL,
+            enabled INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    # Alerts currently raised: one row per topic and rule while the rule
+    # matches, stamped with the snapshot or forecast that raised it
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            topic TEXT NOT NULL,
+            rule_id INTEGER NOT NULL,
+            alert_type TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP,
+            UNIQUE(topic, rule_id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_created_at_id ON alerts(created_at DESC, id ASC)")
+
+    cursor.execute("SELECT 1 FROM alert_rules LIMIT 1")
+    if cursor.fetchone() is None:
+        for rule in DEFAULT_ALERT_RULES:
+            save_rule(cursor, rule)
+    if ALERT_RULES_FILE:
+        for rule in load_rules_file(ALERT_RULES_FILE):
+            save_rule(cursor, rule)
+
+    # Snapshot rules re-run whenever a topic's current snapshot changes
+    for event, row in (("INSERT", "NEW"), ("DELETE", "OLD")):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_trend_latest_alerts_{event.lower()}
+            AFTER {event} ON trend_latest
+            BEGIN
+                {_refresh_topic(SNAPSHOT_RULES, f"{row}.topic")}
+            END
+        """)
+
+    # Forecast rules re-run on new history points and forecasts, skipped
+    # entirely while no forecast rule is enabled
+    has_forecast_rules = "EXISTS (SELECT 1 FROM alert_rules WHERE kind = 'forecast' AND enabled)"
+    for table, event, row in (
+        ("trend_history", "INSERT", "NEW"),
+        ("trend_predictions", "INSERT", "NEW"),
+        ("trend_predictions", "UPDATE", "NEW"),
+        ("trend_predictions", "DELETE", "OLD"),
+    ):
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_alerts_{event.lower()}
+            AFTER {event} ON {table}
+            WHEN {has_forecast_rules}
+            BEGIN
+                {_refresh_topic(FORECAST_RULES, f"{row}.topic")}
+            END
+        """)
+
+    # Raise alerts for data written before the rules existed
+    cursor.execute("SELECT 1 FROM alerts LIMIT 1")
+    if cursor.fetchone() is None or ALERT_RULES_FILE:
+        evaluate_all(cursor)
+
+
+def load_rules_file(path: str) -> List[Dict]:
+    """Read a JSON list of rules"""
+    with open(path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    if not isinstance(rules, list):
+        raise ValueError(f"{path} must contain a JSON list of alert rules")
+    return rules
+
+
+def save_rule(cursor, rule: Dict) -> int:
+    """
+    Insert a rule, or replace the rule with the same name.
+
+    Args:
+        cursor: Cursor of an open transaction
+        rule: Rule fields; name, kind, operator, threshold and message are
+            required, alert_type defaults to the name
+
+    Returns:
+        The rule id
+    """
+    unknown = set(rule) - set(RULE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown alert rule fields: {sorted(unknown)}")
+    values = {**RULE_DEFAULTS, 'alert_type': rule.get('name'), **rule}
+    columns = ", ".join(RULE_COLUMNS)
+    placeholders = ", ".join("?" for _ in RULE_COLUMNS)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in RULE_COLUMNS[1:])
+    cursor.execute(f"""
+        INSERT INTO alert_rules ({columns}) VALUES ({placeholders})
+        ON CONFLICT (name) DO UPDATE SET {updates}
+    """, tuple(values.get(column) for column in RULE_COLUMNS))
+    cursor.execute("SELECT id FROM alert_rules WHERE name = ?", (values['name'],))
+    return cursor.fetchone()[0]
+
+
+def evaluate_rule(cursor, rule_id: int):
+    """Re-raise one rule's alerts across all topics, e.g. after it changed"""
+    cursor.execute("DELETE FROM alerts WHERE rule_id = ?", (rule_id,))
+    for group in (SNAPSHOT_RULES, FORECAST_RULES):
+        cursor.execute(_raise_alerts(group, "r.id = ?"), (rule_id,))
+
+
+def evaluate_all(cursor):
+    """Re-raise every rule's alerts across all topics"""
+    cursor.execute("DELETE FROM alerts")
+    for group in (SNAPSHOT_RULES, FORECAST_RULES):
+        cursor.execute(_raise_alerts(group, "1"))
@@ -3,25 +3,66 @@ FastAPI server for TrendLytix
 Local-only implementation with SQLite database and ML integration
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Dict
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Dict, Tuple
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+import base64
+import json
 import sys
 import os
+import time
 
 # Add backend directory to path
 sys.path.insert(0, os.path.dirname(__file__))
 
 from database import (
     init_database, get_trend_snapshots, get_trend_by_topic, get_trend_by_id,
-    get_trends_by_topics, get_trend_history, get_prediction
+    get_trends_by_topics, get_prediction, get_predictions, get_data_version, get_active_alerts,
+    get_topic_alerts, close_pool, SNAPSHOT_COLUMNS, TrendSnapshot
 )
-from ml.predictor import TrendPredictor
+from forecast_job import ForecastWorker, refresh_topic, refresh_topics, shutdown_forecast_processes
+from retention_job import RetentionWorker
+from executors import run_db, run_ml, shutdown_executors
+from fast_json import fast_json
+from metrics import METRICS_ENABLED, count, observe, register_callback, render_metrics, timed
 from enhanced_analysis import fetch_prioritized_trends
-from domain_classifier import classify_topic
-
-app = FastAPI(title="TrendLytix API", version="1.0.0")
+from domain_classifier import classify_topic, get_cache_stats
+from response_cache import ResponseCache, http_date, is_not_modified, make_etag
+
+# Enriched list payloads, reused until a snapshot or forecast is written
+response_cache = ResponseCache()
+register_callback("trendlytix_response_cache_hits_total", "counter",
+                  "Response cache hits", lambda: response_cache.hits)
+register_callback("trendlytix_response_cache_misses_total", "counter",
+                  "Response cache misses", lambda: response_cache.misses)
+register_callback("trendlytix_classification_cache_hits_total", "counter",
+                  "Domain classification cache hits", lambda: get_cache_stats()["hits"])
+register_callback("trendlytix_classification_cache_misses_total", "counter",
+                  "Domain classification cache misses", lambda: get_cache_stats()["misses"])
+
+# Background jobs: refit forecasts whenever new history arrives, and
+# roll old history into hourly/daily tiers
+forecast_worker = ForecastWorker()
+retention_worker = RetentionWorker()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the background workers for the lifetime of the server and release pooled connections"""
+    forecast_worker.start()
+    retention_worker.start()
+    yield
+    retention_worker.stop()
+    forecast_worker.stop()
+    shutdown_executors()
+    shutdown_forecast_processes()
+    close_pool()
+
+
+app = FastAPI(title="TrendLytix API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -32,32 +73,208 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if METRICS_ENABLED:
+    @app.middleware("http")
+    async def time_requests(request: Request, call_next):
+        """Record end-to-end latency per route"""
+        started = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get("route")
+        observe("request", route.path if route else "unmatched", time.perf_counter() - started)
+        return response
+
 # Initialize database on startup
 init_database()
 
-# Initialize ML predictor
-predictor = TrendPredictor()
+# Topics enriched per step when streaming a report
+REPORT_STREAM_CHUNK = int(os.getenv("TRENDLYTIX_REPORT_STREAM_CHUNK", "25"))
+
+REPORT_DISCLAIMER = "Report data is based on statistical models. Use for academic and research purposes only."
 
 
-def enrich_trend_with_ml(trend_data: Dict) -> Dict:
-    """Enrich trend data with ML predictions and analysis"""
-    topic = trend_data.get('topic', '')
+async def _validators(key: tuple) -> Tuple[tuple, Dict[str, str]]:
+    """Current data version and the HTTP validators derived from it"""
+    versions = await run_db(get_data_version)
+    version = tuple(sorted((name, info['version']) for name, info in versions.items()))
+    validators = {
+        "ETag": make_etag(key, version),
+        "Cache-Control": "no-cache"
+    }
+    last_modified = http_date(max((info['updated_at'] or '' for info in versions.values()), default=None))
+    if last_modified:
+        validators["Last-Modified"] = last_modified
+    return version, validators
+
+
+async def _cached_payload(request: Request, response: Response, key: tuple,
+                          build: Callable[[], Awaitable[Dict]]):
+    """
+    Serve a list payload from the response cache with HTTP validators.
+    
+    The ETag and Last-Modified come from the snapshot and forecast change
+    counters, so a matching conditional request gets a 304 before any
+    enrichment or serialization runs.
+    """
+    version, validators = await _validators(key)
+    if is_not_modified(request.headers, validators["ETag"], validators.get("Last-Modified")):
+        count("not_modified", key[0])
+        return Response(status_code=304, headers=validators)
+    
+    payload = response_cache.get(key, version)
+    if payload is None:
+        payload = await build()
+        # Building may fit missing forecasts, which bumps the version
+        version, validators = await _validators(key)
+        response_cache.put(key, version, payload)
+    # Set only once the payload is real, so mock fallbacks never carry validators
+    response.headers.update(validators)
+    return payload
+
+
+# Builders for the fields the frontend expects on top of the snapshot columns,
+# each called with (trend_data, predictions)
+ENRICHED_FIELDS = {
+    'id': lambda t, p: str(t.id),
+    'name': lambda t, p: t.topic,
+    'category': lambda t, p: t.domain,
+    'strengthScore': lambda t, p: int(t.trend_score * 100),
+    'growthRate': lambda t, p: t.trend_score * 10,  # Approximate growth rate
+    'mentionVelocity': lambda t, p: t.num_sources * 10,
+    'timeConsistency': lambda t, p: 70,  # Placeholder
+    'sentiment': lambda t, p: {
+        'positive': 60,
+        'negative': 20,
+        'neutral': 20
+    },
+    'patterns': lambda t, p: _get_patterns(t),
+    'sources': lambda t, p: _get_sources(t),
+    'riskLevel': lambda t, p: _get_risk_level(t),
+    'riskReasons': lambda t, p: _get_risk_reasons(t),
+    'predictions': lambda t, p: p,
+    'topKeywords': lambda t, p: [t.topic],
+    'triggeringEvents': lambda t, p: [],
+    'sourceDominance': lambda t, p: t.sources,
+    'geoDistribution': lambda t, p: [],
+    'actionInsights': lambda t, p: {
+        'contentIdeas': [],
+        'startupIdeas': [],
+        'researchOpportunities': []
+    },
+    'mentionsTimeline': lambda t, p: [],
+    'description': lambda t, p: f"Trending topic: {t.topic}",
+    'confidence': lambda t, p: p.get('confidence', 'low'),
+    'dataSources': lambda t, p: t.sources.split(',') if t.sources else []
+}
+
+# Fields that need the stored forecast
+ML_FIELDS = {'predictions', 'confidence'}
+
+# Field carrying the topic's alerts, read from the alerts table
+ALERTS_FIELD = 'alerts'
+
+
+@timed("enrich")
+def enrich_trend_with_ml(trend_data: TrendSnapshot, forecast: Optional[Dict] = None,
+                         fields: Optional[List[str]] = None, alerts: Optional[List[Dict]] = None) -> Dict:
+    """
+    Enrich trend data with ML predictions and analysis.
+    
+    This is where a snapshot record becomes a JSON-ready dict: the snapshot
+    columns are copied once and the enriched fields are added to that dict.
+    
+    Args:
+        trend_data: Trend snapshot record
+        forecast: Stored forecast for the topic, looked up if not given
+        fields: Projection of fields to return; None returns the full payload
+            and skips nothing
+        alerts: Alerts raised for the topic, looked up if not given
+    """
+    topic = trend_data.topic
     if not topic:
-        return trend_data
+        return trend_data.to_dict()
     
-    # Get historical data for ML
-    history = get_trend_history(topic, days=30)
+    if alerts is None and (fields is None or ALERTS_FIELD in fields):
+        alerts = get_topic_alerts([topic]).get(topic, [])
     
-    # Prepare historical data for ML
-    historical_data = [
-        {
-            'timestamp': row['timestamp'],
-            'trend_score': row['trend_score']
-        }
-        for row in history
-    ]
+    predictions = None
+    if fields is None or not ML_FIELDS.isdisjoint(fields):
+        # Read the stored forecast, fitting on demand only when none exists yet
+        if forecast is None:
+            forecast = get_prediction(topic) or refresh_topic(topic, trend_data.domain)
+        predictions = _get_predictions(trend_data, forecast)
+    
+    if fields is None:
+        # Enrich with additional fields expected by frontend
+        enriched = trend_data.to_dict()
+        for field, build in ENRICHED_FIELDS.items():
+            enriched[field] = build(trend_data, predictions)
+        enriched[ALERTS_FIELD] = alerts
+        return enriched
+    
+    # Projection: the id is always returned so clients can link to the detail view
+    projected = {'id': str(trend_data.id)}
+    for field in fields:
+        if field in ENRICHED_FIELDS:
+            projected[field] = ENRICHED_FIELDS[field](trend_data, predictions)
+        elif field == ALERTS_FIELD:
+            projected[field] = alerts
+        elif field in SNAPSHOT_COLUMNS:
+            projected[field] = getattr(trend_data, field)
+    return projected
+
+
+def _missing_forecasts(trends: List[TrendSnapshot], forecasts: Dict[str, Dict]) -> List[Tuple[str, str]]:
+    """(topic, domain) pairs of trends without a stored forecast"""
+    missing = {}
+    for trend in trends:
+        if trend.topic and trend.topic not in forecasts:
+            missing.setdefault(trend.topic, trend.domain)
+    return list(missing.items())
+
+
+async def enrich_trends_async(trends: List[TrendSnapshot], fields: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Enrich a list of trends using one bulk lookup of stored forecasts and alerts.
+    
+    The lookups run on the database reader pool and the single batch fit of
+    topics without a stored forecast on the ML pool, keeping both off the
+    event loop.
+    """
+    topics = [trend.topic for trend in trends if trend.topic]
+    alerts = await run_db(get_topic_alerts, topics) if fields is None or ALERTS_FIELD in fields else {}
+    if fields is not None and ML_FIELDS.isdisjoint(fields):
+        return [enrich_trend_with_ml(trend, fields=fields, alerts=alerts.get(trend.topic, [])) for trend in trends]
+    
+    forecasts = await run_db(get_predictions, topics)
+    
+    missing = _missing_forecasts(trends, forecasts)
+    if missing:
+        for forecast in await run_ml(refresh_topics, missing):
+            forecasts[forecast['topic']] = forecast
     
-    # Generate predictions if we have enough data
+    return [
+        enrich_trend_with_ml(trend, forecasts.get(trend.topic), fields, alerts.get(trend.topic, []))
+        for trend in trends
+    ]
+
+
+def _encode_cursor(trend: TrendSnapshot) -> str:
+    """Opaque keyset cursor pointing just past a trend snapshot"""
+    raw = json.dumps([trend.computed_at, trend.id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a keyset cursor, rejecting anything malformed with a 400"""
+    try:
+        computed_at, trend_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(computed_at), int(trend_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _get_predictions(trend_data: TrendSnapshot, forecast: Dict) -> Dict:
+    """Derive frontend prediction fields from a stored forecast"""
     predictions = {
         'growthProbability': 50,
         'peakWindow': 'N/A',
@@ -65,83 +282,40 @@ def enrich_trend_with_ml(trend_data: Dict) -> Dict:
         'confidence': 'low'
     }
     
-    if len(historical_data) >= 2:
-        try:
-            # Train model
-            train_result = predictor.train(historical_data)
-            
-            if train_result.get('status') == 'success':
-                # Generate predictions
-                pred_result = predictor.predict_batch(historical_data)
-                
-                if pred_result.get('status') == 'success':
-                    # Extract 7-day prediction
-                    pred_7day = pred_result.get('predictions_7day', [])
-                    if pred_7day:
-                        latest_pred = pred_7day[-1]
-                        predicted_score = latest_pred.get('predicted_score', 50)
-                        current_score = trend_data.get('trend_score', 0) * 100
-                        
-                        # Calculate growth probability
-                        if predicted_score > current_score:
-                            growth_prob = min(95, int((predicted_score - current_score) / current_score * 100) + 50)
-                            decline_prob = 100 - growth_prob
-                        else:
-                            decline_prob = min(95, int((current_score - predicted_score) / current_score * 100) + 50)
-                            growth_prob = 100 - decline_prob
-                        
-                        predictions = {
-                            'growthProbability': max(5, min(95, growth_prob)),
-                            'peakWindow': latest_pred.get('date', 'N/A'),
-                            'declineProbability': max(5, min(95, decline_prob)),
-                            'confidence': pred_result.get('confidence', 'low')
-                        }
-        except Exception as e:
-            print(f"ML prediction error for {topic}: {e}")
-    
-    # Enrich with additional fields expected by frontend
-    enriched = {
-        **trend_data,
-        'id': str(trend_data.get('id', '')),
-        'name': trend_data.get('topic', ''),
-        'category': trend_data.get('domain', 'Other'),
-        'strengthScore': int(trend_data.get('trend_score', 0) * 100),
-        'growthRate': trend_data.get('trend_score', 0) * 10,  # Approximate growth rate
-        'mentionVelocity': trend_data.get('num_sources', 1) * 10,
-        'timeConsistency': 70,  # Placeholder
-        'sentiment': {
-            'positive': 60,
-            'negative': 20,
-            'neutral': 20
-        },
-        'patterns': _get_patterns(trend_data),
-        'sources': _get_sources(trend_data),
-        'riskLevel': _get_risk_level(trend_data),
-        'riskReasons': _get_risk_reasons(trend_data),
-        'predictions': predictions,
-        'topKeywords': [topic],
-        'triggeringEvents': [],
-        'sourceDominance': trend_data.get('sources', ''),
-        'geoDistribution': [],
-        'actionInsights': {
-            'contentIdeas': [],
-            'startupIdeas': [],
-            'researchOpportunities': []
-        },
-        'alerts': _get_alerts(trend_data),
-        'mentionsTimeline': [],
-        'description': f"Trending topic: {topic}",
-        'confidence': predictions.get('confidence', 'low'),
-        'dataSources': trend_data.get('sources', '').split(',') if trend_data.get('sources') else []
-    }
+    if forecast.get('data_points', 0) < 2 or not forecast.get('history_until'):
+        return predictions
     
-    return enriched
+    try:
+        # The 7-day forecast is stored; its date is 7 days past the last history point
+        predicted_score = forecast.get('prediction_week', 50)
+        current_score = trend_data.trend_score * 100
+        peak_date = datetime.fromisoformat(forecast['history_until']) + timedelta(days=7)
+        
+        # Calculate growth probability
+        if predicted_score > current_score:
+            growth_prob = min(95, int((predicted_score - current_score) / current_score * 100) + 50)
+            decline_prob = 100 - growth_prob
+        else:
+            decline_prob = min(95, int((current_score - predicted_score) / current_score * 100) + 50)
+            growth_prob = 100 - decline_prob
+        
+        predictions = {
+            'growthProbability': max(5, min(95, growth_prob)),
+            'peakWindow': peak_date.date().isoformat(),
+            'declineProbability': max(5, min(95, decline_prob)),
+            'confidence': forecast.get('confidence', 'low')
+        }
+    except Exception as e:
+        count("prediction_error")
+        print(f"ML prediction error for {trend_data.topic}: {e}")
+    
+    return predictions
 
 
-def _get_patterns(trend_data: Dict) -> List[Dict]:
+def _get_patterns(trend_data: TrendSnapshot) -> List[Dict]:
     """Determine trend patterns"""
-    direction = trend_data.get('trend_direction', 'stable')
-    score = trend_data.get('trend_score', 0)
+    direction = trend_data.trend_direction
+    score = trend_data.trend_score
     
     patterns = []
     if direction == 'rising':
@@ -177,9 +351,9 @@ def _get_patterns(trend_data: Dict) -> List[Dict]:
     return patterns
 
 
-def _get_sources(trend_data: Dict) -> List[Dict]:
+def _get_sources(trend_data: TrendSnapshot) -> List[Dict]:
     """Format sources for frontend"""
-    sources_str = trend_data.get('sources', '')
+    sources_str = trend_data.sources
     sources_list = sources_str.split(',') if sources_str else []
     
     source_map = {
@@ -189,14 +363,14 @@ def _get_sources(trend_data: Dict) -> List[Dict]:
     }
     
     sources = []
-    total_score = (trend_data.get('google_score', 0) + 
-                   trend_data.get('wiki_score', 0) + 
-                   trend_data.get('news_score', 0))
+    total_score = (trend_data.google_score + 
+                   trend_data.wiki_score + 
+                   trend_data.news_score)
     
     if total_score > 0:
         for source in sources_list:
             if source in source_map:
-                score = trend_data.get(f'{source.replace("_trending", "")}_score', 0)
+                score = getattr(trend_data, f'{source.replace("_trending", "")}_score', 0)
                 contribution = (score / total_score * 100) if total_score > 0 else 0
                 sources.append({
                     'name': source_map[source]['name'],
@@ -210,10 +384,10 @@ def _get_sources(trend_data: Dict) -> List[Dict]:
     ]
 
 
-def _get_risk_level(trend_data: Dict) -> str:
+def _get_risk_level(trend_data: TrendSnapshot) -> str:
     """Determine risk level"""
-    score = trend_data.get('trend_score', 0)
-    num_sources = trend_data.get('num_sources', 1)
+    score = trend_data.trend_score
+    num_sources = trend_data.num_sources
     
     if score > 0.8 and num_sources >= 2:
         return 'low'
@@ -223,11 +397,11 @@ def _get_risk_level(trend_data: Dict) -> str:
         return 'high'
 
 
-def _get_risk_reasons(trend_data: Dict) -> List[str]:
+def _get_risk_reasons(trend_data: TrendSnapshot) -> List[str]:
     """Get risk reasons"""
     reasons = []
-    score = trend_data.get('trend_score', 0)
-    num_sources = trend_data.get('num_sources', 1)
+    score = trend_data.trend_score
+    num_sources = trend_data.num_sources
     
     if score < 0.3:
         reasons.append('Low trend score indicates weak signal')
@@ -239,32 +413,8 @@ def _get_risk_reasons(trend_data: Dict) -> List[str]:
     return reasons if reasons else ['No significant risks detected']
 
 
-def _get_alerts(trend_data: Dict) -> List[Dict]:
-    """Generate alerts based on trend data"""
-    alerts = []
-    direction = trend_data.get('trend_direction', 'stable')
-    score = trend_data.get('trend_score', 0)
-    
-    if direction == 'rising' and score > 0.7:
-        alerts.append({
-            'type': 'spike',
-            'message': f"Rapid growth detected for {trend_data.get('topic', 'trend')}",
-            'timestamp': datetime.utcnow().isoformat(),
-            'priority': 'high'
-        })
-    elif direction == 'falling' and score < 0.3:
-        alerts.append({
-            'type': 'decline',
-            'message': f"Declining interest in {trend_data.get('topic', 'trend')}",
-            'timestamp': datetime.utcnow().isoformat(),
-            'priority': 'medium'
-        })
-    
-    return alerts
-
-
 @app.get("/")
-def root():
+async def root():
     """API root endpoint"""
     return {
         "message": "TrendLytix API",
@@ -273,12 +423,20 @@ def root():
     }
 
 
+if METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def get_metrics():
+        """Performance metrics in the Prometheus text format"""
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/home/trending")
-def get_home_trending():
+@fast_json
+async def get_home_trending(request: Request, response: Response):
     """Get trending topics for home page"""
-    try:
-        trends = get_trend_snapshots(limit=10)
-        enriched_trends = [enrich_trend_with_ml(trend) for trend in trends]
+    async def build():
+        trends = await run_db(get_trend_snapshots, limit=10)
+        enriched_trends = await enrich_trends_async(trends)
         
         return {
             "trends": enriched_trends,
@@ -286,7 +444,11 @@ def get_home_trending():
             "dataSources": ["Local SQLite Database"],
             "disclaimer": "Trends are based on statistical analysis. Predictions are probabilistic and not absolute."
         }
+    
+    try:
+        return await _cached_payload(request, response, ("home_trending",), build)
     except Exception as e:
+        count("mock_fallback", "get_home_trending")
         # Return mock data on error
         return {
             "trends": _get_mock_trends(10),
@@ -298,11 +460,12 @@ def get_home_trending():
 
 
 @app.get("/api/dashboard/summary")
-def get_dashboard_summary():
+@fast_json
+async def get_dashboard_summary(request: Request, response: Response):
     """Get dashboard summary data"""
-    try:
-        trends = get_trend_snapshots(limit=48)
-        enriched_trends = [enrich_trend_with_ml(trend) for trend in trends]
+    async def build():
+        trends = await run_db(get_trend_snapshots, limit=48)
+        enriched_trends = await enrich_trends_async(trends)
         
         return {
             "summary": enriched_trends,
@@ -310,7 +473,11 @@ def get_dashboard_summary():
             "dataSources": ["Local SQLite Database"],
             "disclaimer": "Summary data is based on recent trend snapshots. Use for decision support, not absolute truth."
         }
+    
+    try:
+        return await _cached_payload(request, response, ("dashboard_summary",), build)
     except Exception as e:
+        count("mock_fallback", "get_dashboard_summary")
         return {
             "summary": _get_mock_trends(48),
             "confidence": "low",
@@ -321,21 +488,38 @@ def get_dashboard_summary():
 
 
 @app.get("/api/trends")
-def get_trends():
-    """Get all trends"""
-    try:
-        trends = get_trend_snapshots(limit=48)
-        enriched_trends = [enrich_trend_with_ml(trend) for trend in trends]
+@fast_json
+async def get_trends(
+    request: Request,
+    response: Response,
+    limit: int = Query(48, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="nextCursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. name,strengthScore,category")
+):
+    """Get all trends, one keyset-paginated page at a time"""
+    after = _decode_cursor(cursor) if cursor else None
+    # Requested fields in order, without duplicates
+    field_list = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip())) if fields else None
+    
+    async def build():
+        trends = await run_db(get_trend_snapshots, limit=limit, after=after)
+        enriched_trends = await enrich_trends_async(trends, field_list)
         
         return {
             "trends": enriched_trends,
+            "nextCursor": _encode_cursor(trends[-1]) if len(trends) == limit else None,
             "confidence": "medium",
             "dataSources": ["Local SQLite Database"],
             "disclaimer": "Trend data is probabilistic. Confidence levels indicate model reliability."
         }
+    
+    try:
+        key = ("trends", limit, after, tuple(field_list) if field_list is not None else None)
+        return await _cached_payload(request, response, key, build)
     except Exception as e:
+        count("mock_fallback", "get_trends")
         return {
-            "trends": _get_mock_trends(48),
+            "trends": _get_mock_trends(limit),
             "confidence": "low",
             "dataSources": ["Mock Data"],
             "error": str(e)
@@ -343,21 +527,27 @@ def get_trends():
 
 
 @app.get("/api/trends/{id}")
-def get_trend_detail(id: str):
+@fast_json
+async def get_trend_detail(id: str):
     """Get trend detail by ID or topic"""
     try:
         # Try as ID first
         try:
             trend_id = int(id)
-            trend = get_trend_by_id(trend_id)
+            trend = await run_db(get_trend_by_id, trend_id)
         except ValueError:
             # Treat as topic
-            trend = get_trend_by_topic(id)
+            trend = await run_db(get_trend_by_topic, id)
         
         if not trend:
             raise HTTPException(status_code=404, detail="Trend not found")
         
-        enriched = enrich_trend_with_ml(trend)
+        # Stored forecasts are a plain read; only a topic never fitted before waits on the ML pool
+        forecast = await run_db(get_prediction, trend.topic) if trend.topic else None
+        if forecast is None and trend.topic:
+            forecast = await run_ml(refresh_topic, trend.topic, trend.domain)
+        alerts = await run_db(get_topic_alerts, [trend.topic]) if trend.topic else {}
+        enriched = enrich_trend_with_ml(trend, forecast, alerts=alerts.get(trend.topic, []))
         
         return {
             "trend": enriched,
@@ -368,6 +558,7 @@ def get_trend_detail(id: str):
     except HTTPException:
         raise
     except Exception as e:
+        count("mock_fallback", "get_trend_detail")
         # Return mock trend on error
         mock_trend = _get_mock_trends(1)[0]
         mock_trend['id'] = id
@@ -382,15 +573,16 @@ def get_trend_detail(id: str):
 
 
 @app.get("/api/compare")
-def compare_trends(topics: Optional[str] = Query(None)):
+@fast_json
+async def compare_trends(topics: Optional[str] = Query(None)):
     """Compare multiple trends"""
     if not topics:
         raise HTTPException(status_code=400, detail="No topics provided. Use ?topics=topic1,topic2")
     
     try:
         topic_list = [t.strip() for t in topics.split(",")]
-        trends = get_trends_by_topics(topic_list, limit=48)
-        enriched_trends = [enrich_trend_with_ml(trend) for trend in trends]
+        trends = await run_db(get_trends_by_topics, topic_list, limit=48)
+        enriched_trends = await enrich_trends_async(trends)
         
         return {
             "compare": enriched_trends,
@@ -399,6 +591,7 @@ def compare_trends(topics: Optional[str] = Query(None)):
             "disclaimer": "Comparisons are based on current trend scores. Historical context may vary."
         }
     except Exception as e:
+        count("mock_fallback", "compare_trends")
         return {
             "compare": _get_mock_trends(min(len(topic_list) if topics else 2, 10)),
             "confidence": "low",
@@ -408,30 +601,24 @@ def compare_trends(topics: Optional[str] = Query(None)):
 
 
 @app.get("/api/alerts")
-def get_alerts():
+@fast_json
+async def get_alerts(request: Request, response: Response):
     """Get trend alerts"""
-    try:
-        trends = get_trend_snapshots(limit=10)
-        all_alerts = []
-        
-        for trend in trends:
-            enriched = enrich_trend_with_ml(trend)
-            alerts = enriched.get('alerts', [])
-            all_alerts.extend(alerts)
-        
-        # Filter for rising trends with high score
-        filtered_alerts = [
-            alert for alert in all_alerts
-            if alert.get('priority') in ['high', 'medium']
-        ]
+    async def build():
+        # Raised in SQL as snapshots are written; no enrichment needed here
+        alerts = await run_db(get_active_alerts, limit=10, priorities=('high', 'medium'))
         
         return {
-            "alerts": filtered_alerts[:10],
+            "alerts": alerts,
             "confidence": "medium",
             "dataSources": ["Local SQLite Database"],
             "disclaimer": "Alerts are generated based on trend patterns. Verify with additional sources."
         }
+    
+    try:
+        return await _cached_payload(request, response, ("alerts",), build)
     except Exception as e:
+        count("mock_fallback", "get_alerts")
         return {
             "alerts": [],
             "confidence": "low",
@@ -440,23 +627,69 @@ def get_alerts():
         }
 
 
+async def _stream_report(topics: List[str]) -> AsyncIterator[str]:
+    """
+    Yield a report as NDJSON, one enriched trend per line.
+    
+    Topics are looked up and enriched REPORT_STREAM_CHUNK at a time, so the
+    first lines go out after the first chunk and only one chunk is held in
+    memory. The last line carries the report metadata under "summary"; an
+    error part-way through ends the stream with an "error" line instead.
+    """
+    streamed = 0
+    try:
+        for start in range(0, len(topics), REPORT_STREAM_CHUNK):
+            chunk = topics[start:start + REPORT_STREAM_CHUNK]
+            trends = await run_db(get_trends_by_topics, chunk, limit=len(chunk))
+            for enriched in await enrich_trends_async(trends):
+                streamed += 1
+                yield json.dumps({"trend": enriched}) + "\n"
+    except Exception as e:
+        count("stream_error", "generate_report")
+        yield json.dumps({"error": str(e)}) + "\n"
+        return
+    
+    yield json.dumps({"summary": {
+        "count": streamed,
+        "confidence": "medium",
+        "dataSources": ["Local SQLite Database"],
+        "disclaimer": REPORT_DISCLAIMER
+    }}) + "\n"
+
+
 @app.post("/api/reports/generate")
-def generate_report(topics: List[str]):
-    """Generate report for specified topics"""
+@fast_json
+async def generate_report(
+    request: Request,
+    topics: List[str],
+    stream: bool = Query(False, description="Stream the report as NDJSON, one trend per line")
+):
+    """
+    Generate report for specified topics.
+    
+    With stream=true or an Accept: application/x-ndjson header the report is
+    streamed line by line and covers every requested topic.
+    """
     if not topics:
         raise HTTPException(status_code=400, detail="No topics provided")
     
+    if stream or "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            _stream_report(list(dict.fromkeys(topics))), media_type="application/x-ndjson"
+        )
+    
     try:
-        trends = get_trends_by_topics(topics, limit=48)
-        enriched_trends = [enrich_trend_with_ml(trend) for trend in trends]
+        trends = await run_db(get_trends_by_topics, topics, limit=48)
+        enriched_trends = await enrich_trends_async(trends)
         
         return {
             "report": enriched_trends,
             "confidence": "medium",
             "dataSources": ["Local SQLite Database"],
-            "disclaimer": "Report data is based on statistical models. Use for academic and research purposes only."
+            "disclaimer": REPORT_DISCLAIMER
         }
     except Exception as e:
+        count("mock_fallback", "generate_report")
         return {
             "report": _get_mock_trends(len(topics)),
             "confidence": "low",
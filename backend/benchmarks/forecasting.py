@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Forecasting benchmark for TrendLytix
+Loads synthetic topics and history into a temporary database, then times the
+predictors, enrichment, domain classification and every API endpoint
+
+Usage:
+    python benchmarks/forecasting.py --topics 10000 --days 90
+    python benchmarks/forecasting.py --topics 500 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sqlite3
+import sys
+import time
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from harness import populate, temporary_database, time_calls
+
+import database
+
+
+def bench_predictors(topics, sample: int, repeat: int) -> dict:
+    """Per-topic sklearn predictor on a sample, batch and incremental fits on all topics"""
+    from forecast_job import build_forecasts, build_forecasts_from_stats
+    from ml.predictor import TrendPredictor
+
+    sampled = topics[:sample]
+    histories = database.get_trend_histories(sampled, days=30)
+    predictor = TrendPredictor()
+
+    def train_and_predict():
+        for topic in sampled:
+            predictor.train(histories[topic])
+            predictor.predict_batch(histories[topic])
+
+    series = database.get_trend_history_series(topics, days=30)
+    batch_input = [(topic, 'Other', series[topic]) for topic in topics]
+    stats = database.get_regression_stats(topics)
+    stats_input = [(topic, 'Other') for topic in topics]
+
+    return {
+        "TrendPredictor.train": time_calls(
+            lambda: [predictor.train(histories[topic]) for topic in sampled], repeat, len(sampled)
+        ),
+        "TrendPredictor.train+predict_batch": time_calls(train_and_predict, repeat, len(sampled)),
+        "get_trend_history_series": time_calls(
+            lambda: database.get_trend_history_series(topics, days=30), repeat, len(topics)
+        ),
+        "BatchTrendPredictor (build_forecasts)": time_calls(
+            lambda: build_forecasts(batch_input), repeat, len(topics)
+        ),
+        "get_regression_stats": time_calls(
+            lambda: database.get_regression_stats(topics), repeat, len(topics)
+        ),
+        "incremental (build_forecasts_from_stats)": time_calls(
+            lambda: build_forecasts_from_stats(stats_input, stats), repeat, len(topics)
+        ),
+    }
+
+
+def bench_enrichment(api_server, limit: int, repeat: int) -> dict:
+    """enrich_trend_with_ml over stored forecasts without the database reads, and enrich_trends_async with them"""
+    trends = database.get_trend_snapshots(limit=limit)
+    forecasts = database.get_predictions([trend.topic for trend in trends])
+    alerts = database.get_topic_alerts([trend.topic for trend in trends])
+    results = {
+        "enrich_trend_with_ml": time_calls(
+            lambda: [
+                api_server.enrich_trend_with_ml(trend, forecasts.get(trend.topic), alerts=alerts.get(trend.topic, []))
+                for trend in trends
+            ],
+            repeat, len(trends)
+        ),
+    }
+    loop = asyncio.new_event_loop()
+    try:
+        results["enrich_trends_async"] = time_calls(
+            lambda: loop.run_until_complete(api_server.enrich_trends_async(trends)), repeat, len(trends)
+        )
+    finally:
+        loop.close()
+    return results
+
+
+def bench_classification(topics, repeat: int) -> dict:
+    """classify_batch with a cold and a warm cache"""
+    import domain_classifier
+
+    def cold():
+        domain_classifier.clear_classification_cache()
+        domain_classifier.PERSIST_CLASSIFICATIONS = False
+        domain_classifier.classify_batch(topics)
+
+    results = {"classify_batch (cold)": time_calls(cold, repeat, len(topics))}
+    results["classify_batch (warm)"] = time_calls(
+        lambda: domain_classifier.classify_batch(topics), repeat, len(topics)
+    )
+    return results
+
+
+def bench_endpoints(api_server, topics, requests: int) -> dict:
+    """Every API endpoint through an in-process test client"""
+    from fastapi.testclient import TestClient
+
+    compare = ",".join(topics[:5])
+    report = topics[:50]
+    endpoints = {
+        "GET /api/home/trending": lambda c: c.get("/api/home/trending"),
+        "GET /api/dashboard/summary": lambda c: c.get("/api/dashboard/summary"),
+        "GET /api/trends": lambda c: c.get("/api/trends"),
+        "GET /api/trends?fields=name,strengthScore": lambda c: c.get("/api/trends?fields=name,strengthScore"),
+        "GET /api/trends/{id}": lambda c: c.get(f"/api/trends/{topics[0]}"),
+        "GET /api/compare": lambda c: c.get(f"/api/compare?topics={compare}"),
+        "GET /api/alerts": lambda c: c.get("/api/alerts"),
+        "POST /api/reports/generate": lambda c: c.post("/api/reports/generate", json=report),
+    }
+
+    results = {}
+    with TestClient(api_server.app) as client:
+        for name, call in endpoints.items():
+            response = call(client)
+            if response.status_code != 200 or "error" in response.text[:2000]:
+                print(f"[WARN] {name} returned {response.status_code} or a fallback payload", file=sys.stderr)
+            results[name] = time_calls(lambda: call(client), requests)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark forecasting, enrichment and the API on synthetic data")
+    parser.add_argument('--topics', type=int, default=1000, help="Synthetic topics")
+    parser.add_argument('--days', type=int, default=90, help="Days of history per topic")
+    parser.add_argument('--points-per-day', type=int, default=1, help="History points per topic per day")
+    parser.add_argument('--sample', type=int, default=200, help="Topics timed with the per-topic sklearn predictor")
+    parser.add_argument('--repeat', type=int, default=5, help="Repetitions of each bulk measurement")
+    parser.add_argument('--requests', type=int, default=100, help="Requests per endpoint")
+    parser.add_argument('--no-response-cache', action='store_true', help="Recompute list payloads on every request")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic data")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+        },
+    }
+
+    # Progress messages go to stderr so stdout carries only the JSON report
+    with temporary_database(), redirect_stdout(sys.stderr):
+        report["dataset"] = populate(args.topics, args.days, args.points_per_day, args.seed)
+        topics = [trend.topic for trend in database.get_trend_snapshots(limit=args.topics)]
+
+        # Imported only now, so module-level initialization uses the temporary database
+        import api_server
+        api_server.forecast_worker.start = lambda: None
+        api_server.retention_worker.start = lambda: None
+        if args.no_response_cache:
+            api_server.response_cache.maxsize = 0
+
+        report["predictors"] = bench_predictors(topics, min(args.sample, len(topics)), args.repeat)
+
+        from forecast_job import refresh_topics
+        refresh_topics([(topic, 'Other') for topic in topics])
+        report["enrichment"] = bench_enrichment(api_server, 48, args.repeat * 20)
+        report["classification"] = bench_classification(topics, args.repeat)
+        report["endpoints"] = bench_endpoints(api_server, topics, args.requests)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+        print(f"[OK] Benchmark results written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
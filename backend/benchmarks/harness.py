@@ -0,0 +1,157 @@
+"""
+Shared helpers for the TrendLytix benchmarks
+Timing summaries, throwaway databases and synthetic trend data
+"""
+
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import database
+
+# Words combined into synthetic topic names; the first group hits the
+# classifier's keyword rules, the second does not
+TOPIC_KEYWORDS = [
+    "AI", "Cloud", "Crypto", "Netflix", "Football", "Election", "Vaccine",
+    "Climate", "Startup", "Olympics", "Album", "Quantum", "Mars", "Inflation"
+]
+TOPIC_WORDS = [
+    "Summit", "Launch", "Update", "Report", "Debate", "Wave", "Season",
+    "Deal", "Review", "Record", "Forecast", "Crisis", "Boom", "Trial"
+]
+SOURCES = ["google_trends", "wiki_trending", "news"]
+
+
+def summarize(samples_ms: List[float], items_per_call: int = 1) -> Dict:
+    """
+    Summarize call latencies.
+
+    Args:
+        samples_ms: One latency per call, in milliseconds
+        items_per_call: Items processed per call, for throughput
+
+    Returns:
+        Dictionary with calls, throughput_per_s, mean_ms, p50_ms and p99_ms
+    """
+    samples = sorted(samples_ms)
+    total_seconds = sum(samples) / 1000
+    return {
+        "calls": len(samples),
+        "throughput_per_s": round(len(samples) * items_per_call / total_seconds, 2) if total_seconds else None,
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 4),
+    }
+
+
+def time_calls(func: Callable[[], object], repeat: int, items_per_call: int = 1) -> Dict:
+    """Run func repeat times and summarize the latencies"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples, items_per_call)
+
+
+@contextmanager
+def temporary_database(copy_from: Optional[str] = None) -> Iterator[str]:
+    """
+    Point the database module at a throwaway SQLite file.
+
+    Args:
+        copy_from: Database to copy in first; None starts empty
+
+    Yields:
+        Path of the temporary database
+    """
+    workdir = tempfile.mkdtemp(prefix="trendlytix-bench-")
+    original_path = database.DB_PATH
+    database.close_pool()
+    database.DB_PATH = os.path.join(workdir, "trendlytix.db")
+    try:
+        if copy_from and os.path.exists(copy_from):
+            shutil.copy(copy_from, database.DB_PATH)
+        yield database.DB_PATH
+    finally:
+        database.close_pool()
+        database.DB_PATH = original_path
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def topic_names(count: int, seed: int = 0) -> List[str]:
+    """Distinct synthetic topic names"""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(TOPIC_KEYWORDS)} {rng.choice(TOPIC_WORDS)} {index}"
+        for index in range(count)
+    ]
+
+
+def populate(topics: int, days: int, points_per_day: int = 1, seed: int = 0) -> Dict:
+    """
+    Fill the current database with synthetic snapshots and history.
+
+    Each topic follows a random linear trend with noise, ending now.
+
+    Args:
+        topics: Number of topics
+        days: Days of history per topic
+        points_per_day: History points per topic per day
+        seed: Random seed, for reproducible data
+
+    Returns:
+        Dictionary with the row counts and the time taken to load them
+    """
+    database.init_database()
+    rng = random.Random(seed)
+    names = topic_names(topics, seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    step = timedelta(days=1) / points_per_day
+    points = days * points_per_day
+
+    def history():
+        for name in names:
+            start, slope = rng.uniform(10, 90), rng.uniform(-1, 1)
+            for index in range(points):
+                yield {
+                    'topic': name,
+                    'trend_score': max(0.0, min(100.0, start + slope * index / points_per_day + rng.gauss(0, 5))),
+                    'recorded_at': (now - step * (points - 1 - index)).isoformat()
+                }
+
+    def snapshots():
+        for name in names:
+            yield {
+                'topic': name,
+                'trend_score': round(rng.random(), 2),
+                'trend_direction': rng.choice(['rising', 'falling', 'stable']),
+                'google_score': rng.randint(0, 100),
+                'wiki_score': rng.randint(0, 100),
+                'news_score': rng.randint(0, 100),
+                'num_sources': rng.randint(1, 3),
+                'sources': ",".join(rng.sample(SOURCES, rng.randint(1, 3)))
+            }
+
+    started = time.perf_counter()
+    history_result = database.insert_trend_histories(history())
+    snapshot_result = database.insert_trend_snapshots(snapshots())
+    return {
+        "topics": topics,
+        "days": days,
+        "points_per_day": points_per_day,
+        "history_rows": history_result["inserted"],
+        "snapshot_rows": snapshot_result["inserted"],
+        "load_seconds": round(time.perf_counter() - started, 2),
+    }
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for TrendLytix
+Compares FastAPI's default encoding with the fast JSON path on /api/dashboard/summary
+
+Usage:
+    python benchmarks/json_serialization.py --requests 500
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+
+from harness import BACKEND_DIR, temporary_database, time_calls
+
+
+def _run(requests: int) -> dict:
+    import fast_json
+    import api_server
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.testclient import TestClient
+
+    api_server.forecast_worker.start = lambda: None
+    api_server.retention_worker.start = lambda: None
+    results = {}
+
+    with TestClient(api_server.app) as client:
+        # Warm the response cache so the timings are dominated by encoding
+        payload = client.get("/api/dashboard/summary").json()
+        results["payload_bytes"] = len(json.dumps(payload))
+        results["trends"] = len(payload.get("summary", []))
+
+        results["encode"] = {
+            "jsonable_encoder+json": time_calls(
+                lambda: json.dumps(jsonable_encoder(payload)).encode("utf-8"), requests
+            )
+        }
+        orjson, fast_json.orjson = fast_json.orjson, None
+        results["encode"]["fast_json(stdlib)"] = time_calls(lambda: fast_json.dumps(payload), requests)
+        fast_json.orjson = orjson
+        if orjson is not None:
+            results["encode"]["fast_json(orjson)"] = time_calls(lambda: fast_json.dumps(payload), requests)
+
+        results["endpoint"] = {}
+        for name, enabled in (("default", False), ("fast_json", True)):
+            fast_json.FAST_JSON = enabled
+            results["endpoint"][name] = time_calls(lambda: client.get("/api/dashboard/summary"), requests)
+        results["encoder"] = "orjson" if orjson is not None else "json"
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding of the dashboard summary")
+    parser.add_argument('--requests', type=int, default=500, help="Requests (and encodes) per variant")
+    args = parser.parse_args(argv)
+
+    # Work on a copy so forecasts fitted during the run never touch the real database;
+    # progress messages go to stderr so stdout carries only the JSON results
+    with temporary_database(copy_from=os.path.join(BACKEND_DIR, "trendlytix.db")), redirect_stdout(sys.stderr):
+        results = _run(args.requests)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
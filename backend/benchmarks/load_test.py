@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Load test for the TrendLytix API
+Sweeps client concurrency over a weighted mix of frontend calls against a
+running server, optionally with a concurrent ingest writer
+
+Usage:
+    # Start uvicorn on a synthetic temporary database and test it
+    python benchmarks/load_test.py --spawn --topics 2000 --concurrency 1,8,32
+
+    # Test an already running server, writing ingest into its database
+    python benchmarks/load_test.py --url http://localhost:8000 --ingest-rate 20 --db trendlytix.db
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlsplit
+
+from harness import BACKEND_DIR, populate, summarize, temporary_database
+
+import database
+
+# Relative weights of the calls the frontend makes
+DEFAULT_MIX = "summary=4,detail=4,compare=1,alerts=1"
+
+# Runs uvicorn against the database at argv[1]
+SERVER_CODE = """
+import sys
+sys.path.insert(0, {backend!r})
+import database
+database.DB_PATH = sys.argv[1]
+import uvicorn, api_server
+uvicorn.run(api_server.app, host="127.0.0.1", port=int(sys.argv[2]), log_level="warning")
+"""
+
+
+class RequestMix:
+    """Picks weighted random requests from the frontend call mix"""
+
+    def __init__(self, spec: str, topics: List[str], trend_ids: List[str]):
+        self.topics = topics
+        self.trend_ids = trend_ids
+        builders = {
+            "summary": lambda rng: "/api/dashboard/summary",
+            "detail": lambda rng: f"/api/trends/{rng.choice(self.trend_ids)}",
+            "compare": lambda rng: "/api/compare?topics=" + quote(",".join(rng.sample(self.topics, min(3, len(self.topics))))),
+            "alerts": lambda rng: "/api/alerts",
+            "trends": lambda rng: "/api/trends",
+            "home": lambda rng: "/api/home/trending",
+        }
+        self.names = []
+        self.weights = []
+        for part in spec.split(","):
+            name, _, weight = part.partition("=")
+            if name.strip() not in builders:
+                raise ValueError(f"Unknown request type '{name}', expected one of {sorted(builders)}")
+            self.names.append(name.strip())
+            self.weights.append(float(weight or 1))
+        self.builders = builders
+
+    def pick(self, rng: random.Random) -> tuple:
+        name = rng.choices(self.names, self.weights)[0]
+        return name, self.builders[name](rng)
+
+
+def _is_fallback(body: bytes) -> bool:
+    """Endpoints answer errors with mock data and an 'error' field instead of a 5xx"""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(payload, dict) and ("error" in payload or payload.get("dataSources") == ["Mock Data"])
+
+
+def _client(base_url: str, mix: RequestMix, deadline: float, seed: int, results: list):
+    """One keep-alive client issuing requests until the deadline"""
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    rng = random.Random(seed)
+    while time.perf_counter() < deadline:
+        name, path = mix.pick(rng)
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            body = response.read()
+            outcome = "ok" if response.status < 400 else "error"
+            if outcome == "ok" and _is_fallback(body):
+                outcome = "fallback"
+        except (OSError, http.client.HTTPException):
+            outcome = "error"
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        results.append((name, outcome, (time.perf_counter() - started) * 1000))
+    conn.close()
+
+
+def _ingest_writer(topics: List[str], rate: float, stop: threading.Event, counts: Dict[str, int]):
+    """Write snapshots and history points at a steady rate, like the collectors do"""
+    rng = random.Random(0)
+    interval = 1.0 / rate
+    next_write = time.perf_counter()
+    while not stop.is_set():
+        topic = rng.choice(topics)
+        try:
+            database.insert_trend_history(topic, rng.uniform(0, 100))
+            database.insert_trend_snapshot({
+                'topic': topic,
+                'trend_score': round(rng.random(), 2),
+                'trend_direction': rng.choice(['rising', 'falling', 'stable']),
+                'num_sources': rng.randint(1, 3),
+                'sources': 'google_trends,news'
+            })
+            counts["writes"] += 1
+        except Exception as e:
+            counts["failed"] += 1
+            counts["last_error"] = str(e)
+        next_write += interval
+        stop.wait(max(0.0, next_write - time.perf_counter()))
+
+
+def run_level(base_url: str, mix: RequestMix, concurrency: int, duration: float,
+              ingest_rate: float, topics: List[str]) -> Dict:
+    """
+    Drive the server with a fixed number of concurrent clients.
+
+    Returns:
+        Dictionary with throughput, latency percentiles, error and fallback
+        rates overall and per request type, plus ingest counts
+    """
+    results: list = []
+    deadline = time.perf_counter() + duration
+    clients = [
+        threading.Thread(target=_client, args=(base_url, mix, deadline, seed, results), daemon=True)
+        for seed in range(concurrency)
+    ]
+
+    stop = threading.Event()
+    ingest_counts = {"writes": 0, "failed": 0}
+    writer = None
+    if ingest_rate > 0:
+        writer = threading.Thread(target=_ingest_writer, args=(topics, ingest_rate, stop, ingest_counts), daemon=True)
+        writer.start()
+
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    if writer:
+        writer.join()
+
+    def describe(rows) -> Dict:
+        if not rows:
+            return {"requests": 0}
+        latencies = sorted(latency for _, _, latency in rows)
+        summary = summarize(latencies)
+        return {
+            "requests": len(rows),
+            # Wall-clock throughput; summarize() divides by summed latency
+            "throughput_per_s": round(len(rows) / elapsed, 2),
+            "mean_ms": summary["mean_ms"],
+            "p50_ms": summary["p50_ms"],
+            "p90_ms": round(latencies[int(len(latencies) * 0.9)], 4),
+            "p99_ms": summary["p99_ms"],
+            "error_rate": round(sum(1 for _, outcome, _ in rows if outcome == "error") / len(rows), 4),
+            "fallback_rate": round(sum(1 for _, outcome, _ in rows if outcome == "fallback") / len(rows), 4),
+        }
+
+    level = {"concurrency": concurrency, "duration_s": round(elapsed, 2), **describe(results)}
+    level["by_request"] = {
+        name: describe([row for row in results if row[0] == name]) for name in mix.names
+    }
+    if ingest_rate > 0:
+        level["ingest"] = ingest_counts
+    return level
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_server(base_url: str, process: Optional[subprocess.Popen], timeout: float = 60):
+    parts = urlsplit(base_url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("Server process exited during startup")
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not come up within {timeout}s")
+
+
+def _discover(base_url: str) -> tuple:
+    """Topic names and ids currently served, for detail and compare requests"""
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+    conn.request("GET", "/api/trends?limit=500&fields=id,name")
+    trends = json.loads(conn.getresponse().read()).get("trends", [])
+    conn.close()
+    return [trend["name"] for trend in trends], [trend["id"] for trend in trends]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the TrendLytix API with a concurrency sweep")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help="Base URL of a running server")
+    target.add_argument('--spawn', action='store_true', help="Start uvicorn on a synthetic temporary database")
+    parser.add_argument('--topics', type=int, default=1000, help="Synthetic topics (with --spawn)")
+    parser.add_argument('--days', type=int, default=30, help="Days of synthetic history (with --spawn)")
+    parser.add_argument('--concurrency', default="1,4,16,64", help="Comma-separated client counts to sweep")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Weighted request mix, e.g. summary=4,detail=4,compare=1,alerts=1")
+    parser.add_argument('--ingest-rate', type=float, default=0, help="Snapshot+history writes per second during each level")
+    parser.add_argument('--db', help="Database the server uses, for --ingest-rate with --url")
+    parser.add_argument('--output', help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.url and args.ingest_rate > 0 and not args.db:
+        parser.error("--ingest-rate with --url needs --db pointing at the server's database")
+
+    report = {"started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "mix": args.mix, "levels": []}
+    process = None
+
+    with temporary_database() as db_path, redirect_stdout(sys.stderr):
+        if args.spawn:
+            report["dataset"] = populate(args.topics, args.days)
+            database.close_pool()
+            port = _free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            process = subprocess.Popen(
+                [sys.executable, "-c", SERVER_CODE.format(backend=BACKEND_DIR), db_path, str(port)],
+                cwd=BACKEND_DIR, stdout=sys.__stderr__
+            )
+        else:
+            base_url = args.url.rstrip("/")
+            if args.db:
+                database.DB_PATH = os.path.abspath(args.db)
+
+        try:
+            _wait_for_server(base_url, process)
+            topics, trend_ids = _discover(base_url)
+            if not topics:
+                raise RuntimeError("The server returned no trends to request")
+            mix = RequestMix(args.mix, topics, trend_ids)
+
+            for concurrency in (int(level) for level in args.concurrency.split(",")):
+                level = run_level(base_url, mix, concurrency, args.duration, args.ingest_rate, topics)
+                report["levels"].append(level)
+                print(f"[OK] concurrency {concurrency}: {level.get('throughput_per_s', 0)} req/s, "
+                      f"p99 {level.get('p99_ms')} ms, errors {level.get('error_rate')}, "
+                      f"fallbacks {level.get('fallback_rate')}")
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+        print(f"[OK] Load test results written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
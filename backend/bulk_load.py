@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Bulk loader for TrendLytix
+Backfills trend_snapshot or trend_history from NDJSON or CSV files
+using batched transactions
+
+Usage:
+    python bulk_load.py history history.ndjson
+    python bulk_load.py snapshots snapshots.csv --chunk-size 5000
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database import BATCH_CHUNK_SIZE, init_database, insert_trend_histories, insert_trend_snapshots
+
+# CSV values arrive as strings; convert the numeric columns
+NUMERIC_FIELDS = {
+    'trend_score': float,
+    'google_score': int,
+    'wiki_score': int,
+    'news_score': int,
+    'num_sources': int,
+    'domain_confidence': float,
+}
+
+LOADERS = {
+    'snapshots': insert_trend_snapshots,
+    'history': insert_trend_histories,
+}
+
+
+def _convert(row: Dict) -> Dict:
+    """Drop empty CSV cells and convert numeric columns"""
+    converted = {}
+    for key, value in row.items():
+        if value is None or value == '':
+            continue
+        if key in NUMERIC_FIELDS and isinstance(value, str):
+            value = NUMERIC_FIELDS[key](value)
+        converted[key] = value
+    return converted
+
+
+def read_rows(path: str, file_format: str) -> Iterator[Dict]:
+    """
+    Stream rows from an NDJSON or CSV file.
+
+    Args:
+        path: Input file path
+        file_format: 'ndjson' or 'csv'
+
+    Yields:
+        One dict per record
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            for row in csv.DictReader(f):
+                yield _convert(row)
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield _convert(json.loads(line))
+
+
+def detect_format(path: str) -> str:
+    """Infer the file format from its extension"""
+    return 'csv' if path.lower().endswith('.csv') else 'ndjson'
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load trend data into the TrendLytix database")
+    parser.add_argument('table', choices=sorted(LOADERS), help="Target table")
+    parser.add_argument('path', help="NDJSON or CSV file to load")
+    parser.add_argument('--format', choices=['ndjson', 'csv'], help="Input format (default: from extension)")
+    parser.add_argument('--chunk-size', type=int, default=BATCH_CHUNK_SIZE, help="Rows per executemany batch")
+    args = parser.parse_args(argv)
+
+    init_database()
+
+    started = time.perf_counter()
+    file_format = args.format or detect_format(args.path)
+    result = LOADERS[args.table](read_rows(args.path, file_format), chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+
+    print(f"[OK] {args.table}: {result['inserted']} inserted, {result['ignored']} ignored in {elapsed:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,18 +5,76 @@ Replaces Supabase with local database for academic use
 
 import sqlite3
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Iterable, Optional, Tuple
 from contextlib import contextmanager
+from itertools import islice
+
+import numpy as np
+
+from alert_rules import create_alert_schema, evaluate_all, evaluate_rule, save_rule
+from metrics import timed
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "trendlytix.db")
 
+# Bound parameters per IN (...) query, below SQLite's default limit of 999
+MAX_QUERY_PARAMS = 900
+
+# Tables whose writes bump a change counter in data_version
+VERSIONED_TABLES = ("trend_snapshot", "trend_predictions", "alerts")
+
+# History retention tiers: raw points, then hourly and daily rollups (0 keeps forever)
+RAW_RETENTION_DAYS = int(os.getenv("TRENDLYTIX_RAW_RETENTION_DAYS", "30"))
+HOURLY_RETENTION_DAYS = int(os.getenv("TRENDLYTIX_HOURLY_RETENTION_DAYS", "180"))
+DAILY_RETENTION_DAYS = int(os.getenv("TRENDLYTIX_DAILY_RETENTION_DAYS", "0"))
+
+# Rollup tables and their bucket width in seconds, finest first
+ROLLUP_TIERS = (("trend_history_hourly", 3600), ("trend_history_daily", 86400))
+
+# Trailing window, in days before each topic's newest point, covered by the
+# running regression statistics
+REGRESSION_WINDOW_DAYS = int(os.getenv("TRENDLYTIX_REGRESSION_WINDOW_DAYS", "30"))
+
+# Pages released per compaction by PRAGMA incremental_vacuum
+VACUUM_PAGES = int(os.getenv("TRENDLYTIX_VACUUM_PAGES", "2000"))
+
+# SQL expression converting a timestamp column to integer epoch seconds
+EPOCH_SQL = "CAST(strftime('%s', {}) AS INTEGER)"
+
+# Rows per executemany call in the batch insert functions
+BATCH_CHUNK_SIZE = 1000
+
+# Pragmas applied to every pooled connection; override with TRENDLYTIX_SQLITE_<NAME>
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",       # Readers no longer block on ingestion writes
+    "synchronous": "NORMAL",     # Safe with WAL, one fsync per checkpoint
+    "cache_size": -65536,        # 64 MB page cache per connection
+    "mmap_size": 268435456,      # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+for _name in SQLITE_PRAGMAS:
+    SQLITE_PRAGMAS[_name] = os.getenv(f"TRENDLYTIX_SQLITE_{_name.upper()}", SQLITE_PRAGMAS[_name])
+
+# Idle connections kept open for reuse; extra connections are closed on release
+POOL_SIZE = int(os.getenv("TRENDLYTIX_DB_POOL_SIZE", "8"))
+
+# Prepared statements cached per connection, reused across get_db() calls
+STATEMENT_CACHE_SIZE = int(os.getenv("TRENDLYTIX_STATEMENT_CACHE", "256"))
+
 
 def init_database():
     """Initialize SQLite database with all required tables"""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
+    # Let compaction return freed pages to the filesystem; takes effect on new
+    # databases, existing ones are converted by the first compact_history()
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    
     # Create trend_snapshot table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS trend_snapshot (
@@ -36,6 +94,27 @@ def init_database():
         )
     """)
     
+    # Create trend_latest table: the current snapshot of each topic, kept in
+    # sync with trend_snapshot by triggers so reads never scan old snapshots
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS trend_latest (
+            topic TEXT PRIMARY KEY,
+            id INTEGER NOT NULL UNIQUE,
+            domain TEXT DEFAULT 'Other',
+            trend_score REAL DEFAULT 0,
+            trend_direction TEXT DEFAULT 'stable',
+            google_score INTEGER DEFAULT 0,
+            wiki_score INTEGER DEFAULT 0,
+            news_score INTEGER DEFAULT 0,
+            num_sources INTEGER DEFAULT 1,
+            sources TEXT DEFAULT '',
+            domain_confidence REAL DEFAULT 0,
+            computed_at TIMESTAMP,
+            updated_at TIMESTAMP
+        )
+    """)
+    _create_trend_latest_triggers(cursor)
+    
     # Create trend_history table for ML training
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS trend_history (
@@ -44,9 +123,26 @@ def init_database():
             domain TEXT DEFAULT 'Other',
             trend_score REAL DEFAULT 0,
             recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            recorded_ts INTEGER,
             UNIQUE(topic, recorded_at)
         )
     """)
+    _migrate_history_timestamps(cursor)
+    
+    # Create rollup tables for history older than the raw retention window
+    for table, _ in ROLLUP_TIERS:
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                topic TEXT NOT NULL,
+                bucket_ts INTEGER NOT NULL,
+                domain TEXT DEFAULT 'Other',
+                mean_score REAL NOT NULL,
+                min_score REAL NOT NULL,
+                max_score REAL NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (topic, bucket_ts)
+            ) WITHOUT ROWID
+        """)
     
     # Create trend_predictions table
     cursor.execute("""
@@ -63,11 +159,35 @@ def init_database():
             volatility REAL DEFAULT 0,
             trend TEXT DEFAULT 'stable',
             data_points INTEGER DEFAULT 0,
+            history_until TIMESTAMP,
             trained_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             prediction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             UNIQUE(topic)
         )
     """)
+    _ensure_column(cursor, "trend_predictions", "history_until", "TIMESTAMP")
+    
+    # Create trend_regression_stats table: running least-squares sums per
+    # topic over its trailing window, x being days since origin_ts
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS trend_regression_stats (
+            topic TEXT PRIMARY KEY,
+            n INTEGER NOT NULL DEFAULT 0,
+            sum_x REAL NOT NULL DEFAULT 0,
+            sum_y REAL NOT NULL DEFAULT 0,
+            sum_xy REAL NOT NULL DEFAULT 0,
+            sum_xx REAL NOT NULL DEFAULT 0,
+            sum_yy REAL NOT NULL DEFAULT 0,
+            origin_ts INTEGER NOT NULL,
+            window_start_ts INTEGER NOT NULL,
+            last_ts INTEGER NOT NULL
+        )
+    """)
+    _create_regression_stats_triggers(cursor)
+    
+    # Create alert_rules and alerts tables: configurable rules, evaluated by
+    # triggers for the topic of every snapshot, history or forecast write
+    create_alert_schema(cursor)
     
     # Create trending_topics table (raw data from collectors)
     cursor.execute("""
@@ -81,21 +201,457 @@ def init_database():
         )
     """)
     
+    # Create topic_domain table (persisted domain classifications)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS topic_domain (
+            topic TEXT PRIMARY KEY,
+            domain TEXT NOT NULL,
+            confidence REAL DEFAULT 0,
+            rules_version TEXT NOT NULL,
+            classified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    
     # Create indexes
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_snapshot_topic ON trend_snapshot(topic)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_snapshot_computed_at ON trend_snapshot(computed_at DESC)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_history_topic ON trend_history(topic)")
+    # Per-topic newest-first lookups; supersedes the old topic-only index
+    cursor.execute("DROP INDEX IF EXISTS idx_trend_snapshot_topic")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_snapshot_topic_computed_at ON trend_snapshot(topic, computed_at DESC, id DESC)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_latest_computed_at_id ON trend_latest(computed_at DESC, id ASC)")
+    # Keyset pagination order; supersedes the old computed_at-only index
+    cursor.execute("DROP INDEX IF EXISTS idx_trend_snapshot_computed_at")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_snapshot_computed_at_id ON trend_snapshot(computed_at DESC, id ASC)")
+    # Covering index: per-topic time-range reads never touch the table
+    cursor.execute("DROP INDEX IF EXISTS idx_trend_history_topic")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_history_topic_ts ON trend_history(topic, recorded_ts, trend_score)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_predictions_topic ON trend_predictions(topic)")
     
+    # Create data_version table: change counters bumped by triggers on every write,
+    # so readers in any process can tell whether cached results are still current
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            name TEXT PRIMARY KEY,
+            version INTEGER DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    for table in VERSIONED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO data_version (name) VALUES (?)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE data_version
+                    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE name = '{table}';
+                END
+            """)
+    
     conn.commit()
     conn.close()
     print(f"[OK] Database initialized at {DB_PATH}")
 
 
+SNAPSHOT_COLUMNS = (
+    "id", "topic", "domain", "trend_score", "trend_direction", "google_score",
+    "wiki_score", "news_score", "num_sources", "sources", "domain_confidence",
+    "computed_at", "updated_at"
+)
+
+
+# Column list for reads that build TrendSnapshot records
+SNAPSHOT_SELECT = ", ".join(SNAPSHOT_COLUMNS)
+
+
+class TrendSnapshot:
+    """
+    One trend snapshot row, as returned by the snapshot read functions.
+    
+    A slotted record built straight from the row tuple, so reads allocate no
+    per-row dicts; to_dict() produces the JSON-ready mapping when needed.
+    """
+    
+    __slots__ = SNAPSHOT_COLUMNS
+    
+    def __init__(self, id: int, topic: str, domain: str = 'Other', trend_score: float = 0,
+                 trend_direction: str = 'stable', google_score: int = 0, wiki_score: int = 0,
+                 news_score: int = 0, num_sources: int = 1, sources: str = '',
+                 domain_confidence: float = 0, computed_at: Optional[str] = None,
+                 updated_at: Optional[str] = None):
+        self.id = id
+        self.topic = topic
+        self.domain = domain
+        self.trend_score = trend_score
+        self.trend_direction = trend_direction
+        self.google_score = google_score
+        self.wiki_score = wiki_score
+        self.news_score = news_score
+        self.num_sources = num_sources
+        self.sources = sources
+        self.domain_confidence = domain_confidence
+        self.computed_at = computed_at
+        self.updated_at = updated_at
+    
+    def to_dict(self) -> Dict:
+        """Column name to value mapping"""
+        return {column: getattr(self, column) for column in SNAPSHOT_COLUMNS}
+    
+    def __repr__(self) -> str:
+        return f"TrendSnapshot(id={self.id!r}, topic={self.topic!r}, trend_score={self.trend_score!r})"
+
+
+def _create_trend_latest_triggers(cursor):
+    """Keep trend_latest holding the newest (computed_at, id) snapshot per topic"""
+    columns = ", ".join(SNAPSHOT_COLUMNS)
+    new_values = ", ".join(f"NEW.{column}" for column in SNAPSHOT_COLUMNS)
+    newer_exists = """
+        EXISTS (
+            SELECT 1 FROM trend_latest
+            WHERE topic = NEW.topic
+            AND (computed_at > NEW.computed_at OR (computed_at = NEW.computed_at AND id > NEW.id))
+        )
+    """
+    rebuild_topic = f"""
+        INSERT OR REPLACE INTO trend_latest ({columns})
+        SELECT {columns} FROM trend_snapshot
+        WHERE topic = OLD.topic
+        ORDER BY computed_at DESC, id DESC
+        LIMIT 1;
+    """
+    
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trend_latest_insert
+        AFTER INSERT ON trend_snapshot
+        WHEN NOT {newer_exists}
+        BEGIN
+            INSERT OR REPLACE INTO trend_latest ({columns}) VALUES ({new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trend_latest_update
+        AFTER UPDATE ON trend_snapshot
+        BEGIN
+            DELETE FROM trend_latest WHERE topic = OLD.topic OR topic = NEW.topic;
+            {rebuild_topic}
+            INSERT OR REPLACE INTO trend_latest ({columns})
+            SELECT {columns} FROM trend_snapshot
+            WHERE topic = NEW.topic
+            ORDER BY computed_at DESC, id DESC
+            LIMIT 1;
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trend_latest_delete
+        AFTER DELETE ON trend_snapshot
+        BEGIN
+            DELETE FROM trend_latest WHERE id = OLD.id;
+            {rebuild_topic}
+        END
+    """)
+    
+    # Backfill databases created before trend_latest existed
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM trend_latest)")
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO trend_latest ({columns})
+            SELECT {columns} FROM trend_snapshot s
+            WHERE s.id = (
+                SELECT id FROM trend_snapshot
+                WHERE topic = s.topic
+                ORDER BY computed_at DESC, id DESC
+                LIMIT 1
+            )
+        """)
+
+
+def _migrate_history_timestamps(cursor):
+    """Add integer epoch timestamps (recorded_ts) to trend_history and keep them filled"""
+    _ensure_column(cursor, "trend_history", "recorded_ts", "INTEGER")
+    cursor.execute(f"""
+        UPDATE trend_history SET recorded_ts = {EPOCH_SQL.format('recorded_at')}
+        WHERE recorded_ts IS NULL
+    """)
+    # The insert functions set recorded_ts; this covers any other writer
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trend_history_recorded_ts
+        AFTER INSERT ON trend_history
+        WHEN NEW.recorded_ts IS NULL
+        BEGIN
+            UPDATE trend_history SET recorded_ts = {EPOCH_SQL.format('NEW.recorded_at')}
+            WHERE id = NEW.id;
+        END
+    """)
+
+
+def _create_regression_stats_triggers(cursor):
+    """
+    Keep trend_regression_stats in step with trend_history.
+    
+    Each inserted point is added to its topic's sums; points that fall out of
+    the trailing window are subtracted with one range read of the covering
+    index, after which x is rebased onto the window start to keep the sums
+    well conditioned. Deleted points still inside the window are subtracted,
+    and updated scores are swapped in.
+    """
+    window = REGRESSION_WINDOW_DAYS * 86400
+    ts = f"COALESCE(NEW.recorded_ts, {EPOCH_SQL.format('NEW.recorded_at')})"
+    x = f"(({ts} - origin_ts) / 86400.0)"
+    old_x = "((OLD.recorded_ts - origin_ts) / 86400.0)"
+    # Triggers cannot alias the updated table, so the subquery names it in full
+    stats = "trend_regression_stats"
+    expired_x = f"((h.recorded_ts - {stats}.origin_ts) / 86400.0)"
+    # Shift of the origin onto the window start, in days
+    shift = "((window_start_ts - origin_ts) / 86400.0)"
+    
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trend_history_stats_insert
+        AFTER INSERT ON trend_history
+        BEGIN
+            INSERT INTO trend_regression_stats
+                (topic, n, sum_x, sum_y, sum_xy, sum_xx, sum_yy, origin_ts, window_start_ts, last_ts)
+            VALUES (NEW.topic, 1, 0, NEW.trend_score, 0, 0, NEW.trend_score * NEW.trend_score,
+                    {ts}, {ts} - {window}, {ts})
+            ON CONFLICT (topic) DO UPDATE SET
+                n = n + 1,
+                sum_x = sum_x + {x},
+                sum_y = sum_y + NEW.trend_score,
+                sum_xy = sum_xy + {x} * NEW.trend_score,
+                sum_xx = sum_xx + {x} * {x},
+                sum_yy = sum_yy + NEW.trend_score * NEW.trend_score,
+                last_ts = MAX(last_ts, excluded.last_ts)
+            WHERE excluded.last_ts >= window_start_ts;
+            
+            UPDATE trend_regression_stats SET
+                (n, sum_x, sum_y, sum_xy, sum_xx, sum_yy) = (
+                    SELECT {stats}.n - COUNT(*), {stats}.sum_x - TOTAL({expired_x}),
+                           {stats}.sum_y - TOTAL(h.trend_score),
+                           {stats}.sum_xy - TOTAL({expired_x} * h.trend_score),
+                           {stats}.sum_xx - TOTAL({expired_x} * {expired_x}),
+                           {stats}.sum_yy - TOTAL(h.trend_score * h.trend_score)
+                    FROM trend_history h
+                    WHERE h.topic = {stats}.topic
+                    AND h.recorded_ts >= {stats}.window_start_ts
+                    AND h.recorded_ts < {stats}.last_ts - {window}
+                ),
+                window_start_ts = last_ts - {window}
+            WHERE topic = NEW.topic AND window_start_ts < last_ts - {window};
+            
+            UPDATE trend_regression_stats SET
+                sum_x = sum_x - n * {shift},
+                sum_xx = sum_xx - 2 * {shift} * sum_x + n * {shift} * {shift},
+                sum_xy = sum_xy - {shift} * sum_y,
+                origin_ts = window_start_ts
+            WHERE topic = NEW.topic AND origin_ts < window_start_ts;
+        END
+    """)
+    # Deleting a topic's newest point moves its window, so that topic is
+    # rebuilt from its remaining history instead
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trend_history_stats_delete
+        AFTER DELETE ON trend_history
+        BEGIN
+            UPDATE trend_regression_stats SET
+                n = n - 1,
+                sum_x = sum_x - {old_x},
+                sum_y = sum_y - OLD.trend_score,
+                sum_xy = sum_xy - {old_x} * OLD.trend_score,
+                sum_xx = sum_xx - {old_x} * {old_x},
+                sum_yy = sum_yy - OLD.trend_score * OLD.trend_score
+            WHERE topic = OLD.topic AND OLD.recorded_ts >= window_start_ts AND OLD.recorded_ts < last_ts;
+            
+            DELETE FROM trend_regression_stats WHERE topic = OLD.topic AND OLD.recorded_ts >= last_ts;
+            {_regression_stats_select("OLD.topic")}
+            AND NOT EXISTS (SELECT 1 FROM trend_regression_stats WHERE topic = OLD.topic)
+            GROUP BY h.topic;
+        END
+    """)
+    
+    # A changed score is swapped into its topic's sums in place
+    score_delta = "(NEW.trend_score - OLD.trend_score)"
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trend_history_stats_update
+        AFTER UPDATE OF trend_score ON trend_history
+        WHEN OLD.topic = NEW.topic AND OLD.recorded_ts = NEW.recorded_ts
+        BEGIN
+            UPDATE trend_regression_stats SET
+                sum_y = sum_y + {score_delta},
+                sum_xy = sum_xy + {old_x} * {score_delta},
+                sum_yy = sum_yy + NEW.trend_score * NEW.trend_score - OLD.trend_score * OLD.trend_score
+            WHERE topic = OLD.topic AND OLD.recorded_ts >= window_start_ts AND OLD.recorded_ts <= last_ts;
+        END
+    """)
+    # A point moved to another topic or time can shift either topic's window,
+    # so both are rebuilt; filling in a missing recorded_ts moves nothing
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trend_history_stats_move
+        AFTER UPDATE OF topic, recorded_ts ON trend_history
+        WHEN OLD.recorded_ts IS NOT NULL
+        AND (OLD.topic IS NOT NEW.topic OR OLD.recorded_ts IS NOT NEW.recorded_ts)
+        BEGIN
+            DELETE FROM trend_regression_stats WHERE topic IN (OLD.topic, NEW.topic);
+            {_regression_stats_select("OLD.topic")} GROUP BY h.topic;
+            {_regression_stats_select("NEW.topic")} AND NEW.topic IS NOT OLD.topic GROUP BY h.topic;
+        END
+    """)
+    
+    # Seed databases that already hold history
+    cursor.execute("SELECT 1 FROM trend_regression_stats LIMIT 1")
+    if cursor.fetchone() is None:
+        _rebuild_regression_stats(cursor)
+
+
+def _regression_stats_select(topic: Optional[str] = None) -> str:
+    """
+    INSERT computing regression sums from trend_history, up to its WHERE
+    clause; the caller appends any further conditions and GROUP BY h.topic.
+    
+    Args:
+        topic: SQL expression limiting it to one topic (e.g. OLD.topic); None
+            covers every topic
+    """
+    window = REGRESSION_WINDOW_DAYS * 86400
+    x = f"((h.recorded_ts - (latest.last_ts - {window})) / 86400.0)"
+    only_topic = f"WHERE topic = {topic}" if topic else ""
+    return f"""
+        INSERT INTO trend_regression_stats
+            (topic, n, sum_x, sum_y, sum_xy, sum_xx, sum_yy, origin_ts, window_start_ts, last_ts)
+        SELECT h.topic, COUNT(*), TOTAL({x}), TOTAL(h.trend_score), TOTAL({x} * h.trend_score),
+               TOTAL({x} * {x}), TOTAL(h.trend_score * h.trend_score),
+               latest.last_ts - {window}, latest.last_ts - {window}, latest.last_ts
+        FROM trend_history h
+        JOIN (
+            SELECT topic, MAX(recorded_ts) as last_ts FROM trend_history {only_topic} GROUP BY topic
+        ) latest ON latest.topic = h.topic
+        WHERE h.recorded_ts >= latest.last_ts - {window}
+    """
+
+
+def _rebuild_regression_stats(cursor):
+    """Recompute every topic's regression sums from trend_history"""
+    cursor.execute("DELETE FROM trend_regression_stats")
+    cursor.execute(_regression_stats_select() + " GROUP BY h.topic")
+
+
+def rebuild_regression_stats():
+    """
+    Recompute the running regression sums from scratch.
+    
+    The triggers keep them current; this resets accumulated rounding after
+    very long runs or a change of TRENDLYTIX_REGRESSION_WINDOW_DAYS.
+    """
+    with get_db() as conn:
+        _rebuild_regression_stats(conn.cursor())
+
+
+def _ensure_column(cursor, table: str, column: str, definition: str):
+    """Add a column to an existing table created by an older schema"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row[1] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+class ConnectionPool:
+    """Bounded pool of reusable SQLite connections with tuned pragmas"""
+    
+    def __init__(self, db_path: str, size: int = POOL_SIZE, pragmas: Optional[Dict] = None):
+        self.db_path = db_path
+        self.size = size
+        self.pragmas = dict(SQLITE_PRAGMAS if pragmas is None else pragmas)
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._closed = False
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between threads, but only one thread uses each at a time
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, opening a new one if none is available"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+    
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, closing it if the pool is full"""
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    def close(self):
+        """Close all idle connections"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Get the connection pool for the current DB_PATH and process"""
+    global _pool
+    pool = _pool
+    if pool is not None and pool.db_path == DB_PATH and pool.pid == os.getpid():
+        return pool
+    
+    with _pool_lock:
+        if _pool is None or _pool.db_path != DB_PATH or _pool.pid != os.getpid():
+            # Connections inherited through fork belong to the parent; leave them alone
+            if _pool is not None and _pool.pid == os.getpid():
+                _pool.close()
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
+
+
+def configure_pool(size: Optional[int] = None, **pragmas):
+    """
+    Replace the connection pool with new settings.
+    
+    Args:
+        size: Number of idle connections to keep
+        **pragmas: Pragma overrides, e.g. cache_size=-131072
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = ConnectionPool(
+            DB_PATH,
+            size if size is not None else POOL_SIZE,
+            {**SQLITE_PRAGMAS, **pragmas}
+        )
+
+
+def close_pool():
+    """Close all pooled connections"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close()
+        _pool = None
+
+
 @contextmanager
 def get_db():
-    """Context manager for database connections"""
-    conn = sqlite3.connect(DB_PATH)
+    """Context manager for pooled database connections"""
+    pool = get_pool()
+    conn = pool.acquire()
     conn.row_factory = sqlite3.Row  # Enable dict-like access
     try:
         yield conn
@@ -104,7 +660,7 @@ def get_db():
         conn.rollback()
         raise
     finally:
-        conn.close()
+        pool.release(conn)
 
 
 def dict_factory(cursor, row):
@@ -112,136 +668,438 @@ def dict_factory(cursor, row):
     return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
 
 
-def get_trend_snapshots(limit: int = 48) -> List[Dict]:
-    """Get latest trend snapshots"""
+def snapshot_factory(cursor, row):
+    """Build a TrendSnapshot from a row selected with SNAPSHOT_SELECT"""
+    return TrendSnapshot(*row)
+
+
+@timed("db")
+def get_data_version() -> Dict[str, Dict]:
+    """Get the change counter and last write time of each versioned table"""
     with get_db() as conn:
-        conn.row_factory = dict_factory
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM trend_snapshot 
-            ORDER BY computed_at DESC 
-            LIMIT ?
-        """, (limit,))
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.execute("SELECT name, version, updated_at FROM data_version")
+        return {row[0]: {'version': row[1], 'updated_at': row[2]} for row in cursor.fetchall()}
 
 
-def get_trend_by_topic(topic: str) -> Optional[Dict]:
+@timed("db")
+def get_trend_snapshots(limit: int = 48, after: Optional[Tuple[str, int]] = None) -> List[TrendSnapshot]:
+    """
+    Get the current snapshot of each topic, newest first.
+    
+    Args:
+        limit: Maximum number of snapshots
+        after: (computed_at, id) of the last snapshot of the previous page;
+            the keyset continues right after it
+    """
+    with get_db() as conn:
+        conn.row_factory = snapshot_factory
+        cursor = conn.cursor()
+        if after is None:
+            cursor.execute(f"""
+                SELECT {SNAPSHOT_SELECT} FROM trend_latest 
+                ORDER BY computed_at DESC, id ASC 
+                LIMIT ?
+            """, (limit,))
+        else:
+            cursor.execute(f"""
+                SELECT {SNAPSHOT_SELECT} FROM trend_latest 
+                WHERE computed_at <= ? AND (computed_at < ? OR id > ?)
+                ORDER BY computed_at DESC, id ASC 
+                LIMIT ?
+            """, (after[0], after[0], after[1], limit))
+        return cursor.fetchall()
+
+
+@timed("db")
+def get_trend_by_topic(topic: str) -> Optional[TrendSnapshot]:
     """Get latest trend snapshot for a specific topic"""
     with get_db() as conn:
-        conn.row_factory = dict_factory
+        conn.row_factory = snapshot_factory
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT * FROM trend_snapshot 
-            WHERE topic = ? 
-            ORDER BY computed_at DESC 
-            LIMIT 1
-        """, (topic,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        cursor.execute(f"SELECT {SNAPSHOT_SELECT} FROM trend_latest WHERE topic = ?", (topic,))
+        return cursor.fetchone()
 
 
-def get_trend_by_id(trend_id: int) -> Optional[Dict]:
+@timed("db")
+def get_trend_by_id(trend_id: int) -> Optional[TrendSnapshot]:
     """Get trend snapshot by ID"""
     with get_db() as conn:
-        conn.row_factory = dict_factory
+        conn.row_factory = snapshot_factory
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM trend_snapshot WHERE id = ?", (trend_id,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        cursor.execute(f"SELECT {SNAPSHOT_SELECT} FROM trend_snapshot WHERE id = ?", (trend_id,))
+        return cursor.fetchone()
+
+
+@timed("db")
+def get_trends_by_topics(topics: List[str], limit: int = 48) -> List[TrendSnapshot]:
+    """Get the current snapshot of multiple topics, newest first"""
+    unique_topics = list(dict.fromkeys(topics))
+    trends = []
+    with get_db() as conn:
+        conn.row_factory = snapshot_factory
+        cursor = conn.cursor()
+        for start in range(0, len(unique_topics), MAX_QUERY_PARAMS):
+            chunk = unique_topics[start:start + MAX_QUERY_PARAMS]
+            placeholders = ','.join(['?'] * len(chunk))
+            cursor.execute(f"""
+                SELECT {SNAPSHOT_SELECT} FROM trend_latest 
+                WHERE topic IN ({placeholders})
+                ORDER BY computed_at DESC, id ASC 
+                LIMIT ?
+            """, (*chunk, limit))
+            trends.extend(cursor.fetchall())
+    
+    if len(unique_topics) > MAX_QUERY_PARAMS:
+        # Merge the per-chunk pages back into one computed_at DESC, id ASC order
+        trends.sort(key=lambda trend: trend.id)
+        trends.sort(key=lambda trend: trend.computed_at or '', reverse=True)
+    return trends[:limit]
 
 
-def get_trends_by_topics(topics: List[str], limit: int = 48) -> List[Dict]:
-    """Get trends for multiple topics"""
-    if not topics:
-        return []
+@timed("db")
+def get_active_alerts(limit: int = 10, priorities: Tuple[str, ...] = ('high', 'medium')) -> List[Dict]:
+    """
+    Get the alerts currently raised across all topics, newest first.
     
-    placeholders = ','.join(['?'] * len(topics))
+    Args:
+        limit: Maximum number of alerts
+        priorities: Priorities to include
+    """
+    placeholders = ','.join(['?'] * len(priorities))
     with get_db() as conn:
         conn.row_factory = dict_factory
         cursor = conn.cursor()
         cursor.execute(f"""
-            SELECT * FROM trend_snapshot 
-            WHERE topic IN ({placeholders})
-            ORDER BY computed_at DESC 
+            SELECT alert_type AS type, message, created_at AS timestamp, priority
+            FROM alerts
+            WHERE priority IN ({placeholders})
+            ORDER BY created_at DESC, id ASC
             LIMIT ?
-        """, (*topics, limit))
-        return [dict(row) for row in cursor.fetchall()]
+        """, (*priorities, limit))
+        return cursor.fetchall()
+
+
+@timed("db")
+def get_topic_alerts(topics: List[str]) -> Dict[str, List[Dict]]:
+    """Get the alerts currently raised for multiple topics, keyed by topic"""
+    alerts = {}
+    for start in range(0, len(topics), MAX_QUERY_PARAMS):
+        chunk = topics[start:start + MAX_QUERY_PARAMS]
+        placeholders = ','.join(['?'] * len(chunk))
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT topic, alert_type, message, created_at, priority FROM alerts
+                WHERE topic IN ({placeholders})
+                ORDER BY created_at DESC, id ASC
+            """, tuple(chunk))
+            for topic, alert_type, message, created_at, priority in cursor.fetchall():
+                alerts.setdefault(topic, []).append({
+                    'type': alert_type,
+                    'message': message,
+                    'timestamp': created_at,
+                    'priority': priority
+                })
+    return alerts
+
+
+def get_alert_rules() -> List[Dict]:
+    """Get all alert rules"""
+    with get_db() as conn:
+        conn.row_factory = dict_factory
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM alert_rules ORDER BY id")
+        return cursor.fetchall()
+
+
+def save_alert_rule(rule: Dict) -> int:
+    """
+    Add or replace (by name) an alert rule and re-raise its alerts.
+    
+    Args:
+        rule: Rule fields as in alert_rules.DEFAULT_ALERT_RULES
+        
+    Returns:
+        The rule id
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        rule_id = save_rule(cursor, rule)
+        evaluate_rule(cursor, rule_id)
+        return rule_id
+
+
+def delete_alert_rule(name: str) -> bool:
+    """Delete an alert rule and the alerts it raised"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM alerts WHERE rule_id IN (SELECT id FROM alert_rules WHERE name = ?)", (name,))
+        cursor.execute("DELETE FROM alert_rules WHERE name = ?", (name,))
+        return cursor.rowcount > 0
+
+
+def rebuild_alerts():
+    """Re-evaluate every alert rule for every topic"""
+    with get_db() as conn:
+        evaluate_all(conn.cursor())
+
+
+def _history_cutoff(days: int) -> int:
+    """Epoch seconds of the start of a trailing window of days"""
+    return int(time.time()) - days * 86400
+
+
+def _history_resolution(days: int) -> Optional[int]:
+    """Bucket width in seconds for a history window, or None for raw points"""
+    if not RAW_RETENTION_DAYS or days <= RAW_RETENTION_DAYS:
+        return None
+    if not HOURLY_RETENTION_DAYS or days <= HOURLY_RETENTION_DAYS:
+        return ROLLUP_TIERS[0][1]
+    return ROLLUP_TIERS[1][1]
+
+
+def epoch_to_timestamp(epoch: int) -> str:
+    """Format epoch seconds as the ISO timestamp used by the API and predictor"""
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat()
 
 
 def get_trend_history(topic: str, days: int = 30) -> List[Dict]:
     """Get historical trend data for ML training"""
+    return get_trend_histories([topic], days)[topic]
+
+
+def get_trend_histories(topics: List[str], days: int = 30) -> Dict[str, List[Dict]]:
+    """Get historical trend data for many topics in one query, grouped by topic"""
+    return {
+        topic: [
+            {'topic': topic, 'trend_score': score, 'timestamp': epoch_to_timestamp(ts), 'ts': ts}
+            for ts, score in zip(timestamps.tolist(), scores.tolist())
+        ]
+        for topic, (timestamps, scores) in get_trend_history_series(topics, days).items()
+    }
+
+
+@timed("db")
+def get_trend_history_series(topics: List[str], days: int = 30) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Get historical trend data for many topics as numeric arrays.
+    
+    Windows within the raw retention read only the (topic, recorded_ts,
+    trend_score) covering index. Longer windows are served at the
+    resolution of the coarsest rollup tier they reach into.
+    
+    Args:
+        topics: Topics to load
+        days: Trailing window in days
+        
+    Returns:
+        Dictionary mapping topic to (epoch seconds, trend scores), both
+        sorted by time
+    """
+    unique_topics = list(dict.fromkeys(topics))
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=float))
+    series = {topic: empty for topic in unique_topics}
+    if not unique_topics:
+        return series
+    
+    cutoff = _history_cutoff(days)
+    bucket_seconds = _history_resolution(days)
     with get_db() as conn:
-        conn.row_factory = dict_factory
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT topic, trend_score, recorded_at as timestamp
-            FROM trend_history 
-            WHERE topic = ? 
-            AND recorded_at >= datetime('now', '-' || ? || ' days')
-            ORDER BY recorded_at ASC
-        """, (topic, days))
-        return [dict(row) for row in cursor.fetchall()]
+        # Stay under SQLite's bound-parameter limit for very large topic lists
+        for start in range(0, len(unique_topics), MAX_QUERY_PARAMS):
+            chunk = unique_topics[start:start + MAX_QUERY_PARAMS]
+            placeholders = ','.join(['?'] * len(chunk))
+            if bucket_seconds is None:
+                cursor.execute(f"""
+                    SELECT topic, recorded_ts, trend_score
+                    FROM trend_history 
+                    WHERE topic IN ({placeholders})
+                    AND recorded_ts >= ?
+                    ORDER BY topic, recorded_ts ASC
+                """, (*chunk, cutoff))
+            else:
+                # Raw points and finer rollups are averaged into the window's buckets
+                tiers = [f"""
+                    SELECT topic, recorded_ts as ts, trend_score as total, 1 as count
+                    FROM trend_history
+                    WHERE topic IN ({placeholders}) AND recorded_ts >= ?
+                """]
+                for table, table_seconds in ROLLUP_TIERS:
+                    if table_seconds <= bucket_seconds:
+                        tiers.append(f"""
+                            SELECT topic, bucket_ts, mean_score * count, count
+                            FROM {table}
+                            WHERE topic IN ({placeholders}) AND bucket_ts >= ?
+                        """)
+                cursor.execute(f"""
+                    SELECT topic, (ts / {bucket_seconds}) * {bucket_seconds} as bucket,
+                           SUM(total) / SUM(count)
+                    FROM ({" UNION ALL ".join(tiers)})
+                    GROUP BY topic, bucket
+                    ORDER BY topic, bucket ASC
+                """, (*chunk, cutoff) * len(tiers))
+            rows = cursor.fetchall()
+            if not rows:
+                continue
+            
+            row_topics = [row[0] for row in rows]
+            timestamps = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+            scores = np.fromiter((row[2] for row in rows), dtype=float, count=len(rows))
+            
+            # Rows arrive grouped by topic; split at each topic boundary
+            start_index = 0
+            for index in range(1, len(rows) + 1):
+                if index == len(rows) or row_topics[index] != row_topics[start_index]:
+                    series[row_topics[start_index]] = (
+                        timestamps[start_index:index], scores[start_index:index]
+                    )
+                    start_index = index
+    return series
+
+
+# computed_at is normalized to CURRENT_TIMESTAMP's format so snapshots sort by time
+INSERT_SNAPSHOT_SQL = """
+    INSERT INTO trend_snapshot 
+    (topic, domain, trend_score, trend_direction, google_score, 
+     wiki_score, news_score, num_sources, sources, domain_confidence, computed_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(datetime(?), CURRENT_TIMESTAMP))
+"""
+
+INSERT_HISTORY_SQL = f"""
+    INSERT OR IGNORE INTO trend_history 
+    (topic, domain, trend_score, recorded_at, recorded_ts)
+    VALUES (?1, ?2, ?3, COALESCE(?4, CURRENT_TIMESTAMP), {EPOCH_SQL.format("COALESCE(?4, 'now')")})
+"""
+
+INSERT_PREDICTION_SQL = """
+    INSERT OR REPLACE INTO trend_predictions
+    (topic, domain, prediction_tomorrow, prediction_week, prediction_month,
+     r_squared, confidence, momentum, volatility, trend, data_points,
+     history_until)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _snapshot_params(trend_data: Dict) -> tuple:
+    return (
+        trend_data.get('topic'),
+        trend_data.get('domain', 'Other'),
+        trend_data.get('trend_score', 0),
+        trend_data.get('trend_direction', 'stable'),
+        trend_data.get('google_score', 0),
+        trend_data.get('wiki_score', 0),
+        trend_data.get('news_score', 0),
+        trend_data.get('num_sources', 1),
+        trend_data.get('sources', ''),
+        trend_data.get('domain_confidence', 0),
+        trend_data.get('computed_at')
+    )
+
+
+def _history_params(history_data: Dict) -> tuple:
+    return (
+        history_data.get('topic'),
+        history_data.get('domain', 'Other'),
+        history_data.get('trend_score', 0),
+        history_data.get('recorded_at')
+    )
+
+
+def _prediction_params(prediction_data: Dict) -> tuple:
+    return (
+        prediction_data.get('topic'),
+        prediction_data.get('domain', 'Other'),
+        prediction_data.get('prediction_tomorrow', 0),
+        prediction_data.get('prediction_week', 0),
+        prediction_data.get('prediction_month', 0),
+        prediction_data.get('r_squared', 0),
+        prediction_data.get('confidence', 'low'),
+        prediction_data.get('momentum', 0),
+        prediction_data.get('volatility', 0),
+        prediction_data.get('trend', 'stable'),
+        prediction_data.get('data_points', 0),
+        prediction_data.get('history_until')
+    )
+
+
+def _insert_many(sql: str, params: Iterable[tuple], chunk_size: int) -> Dict[str, int]:
+    """Run executemany over chunks of params inside one transaction"""
+    submitted = 0
+    inserted = 0
+    with get_db() as conn:
+        cursor = conn.cursor()
+        params = iter(params)
+        while True:
+            chunk = list(islice(params, chunk_size))
+            if not chunk:
+                break
+            cursor.executemany(sql, chunk)
+            submitted += len(chunk)
+            inserted += cursor.rowcount
+    return {"inserted": inserted, "ignored": submitted - inserted}
 
 
 def insert_trend_snapshot(trend_data: Dict) -> int:
     """Insert or update trend snapshot"""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO trend_snapshot 
-            (topic, domain, trend_score, trend_direction, google_score, 
-             wiki_score, news_score, num_sources, sources, domain_confidence)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            trend_data.get('topic'),
-            trend_data.get('domain', 'Other'),
-            trend_data.get('trend_score', 0),
-            trend_data.get('trend_direction', 'stable'),
-            trend_data.get('google_score', 0),
-            trend_data.get('wiki_score', 0),
-            trend_data.get('news_score', 0),
-            trend_data.get('num_sources', 1),
-            trend_data.get('sources', ''),
-            trend_data.get('domain_confidence', 0)
-        ))
+        cursor.execute(INSERT_SNAPSHOT_SQL, _snapshot_params(trend_data))
         return cursor.lastrowid
 
 
+def insert_trend_snapshots(snapshots: Iterable[Dict], chunk_size: int = BATCH_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Insert many trend snapshots in one transaction.
+    
+    Args:
+        snapshots: Snapshot dicts with the same keys as insert_trend_snapshot,
+            including optional 'computed_at' (defaults to now, for backfills)
+        chunk_size: Rows per executemany call
+        
+    Returns:
+        Dictionary with 'inserted' and 'ignored' row counts
+    """
+    return _insert_many(INSERT_SNAPSHOT_SQL, map(_snapshot_params, snapshots), chunk_size)
+
+
 def insert_trend_history(topic: str, trend_score: float, domain: str = 'Other'):
     """Insert historical trend data point"""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR IGNORE INTO trend_history 
-            (topic, domain, trend_score, recorded_at)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-        """, (topic, domain, trend_score))
+        cursor.execute(INSERT_HISTORY_SQL, (topic, domain, trend_score, None))
+
+
+def insert_trend_histories(points: Iterable[Dict], chunk_size: int = BATCH_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Insert many historical data points in one transaction.
+    
+    Args:
+        points: Dicts with 'topic', 'trend_score', optional 'domain' and
+            optional 'recorded_at' (defaults to now, for backfills)
+        chunk_size: Rows per executemany call
+        
+    Returns:
+        Dictionary with 'inserted' and 'ignored' (duplicate) row counts
+    """
+    return _insert_many(INSERT_HISTORY_SQL, map(_history_params, points), chunk_size)
 
 
 def insert_prediction(prediction_data: Dict):
     """Insert or update trend prediction"""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO trend_predictions
-            (topic, domain, prediction_tomorrow, prediction_week, prediction_month,
-             r_squared, confidence, momentum, volatility, trend, data_points)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            prediction_data.get('topic'),
-            prediction_data.get('domain', 'Other'),
-            prediction_data.get('prediction_tomorrow', 0),
-            prediction_data.get('prediction_week', 0),
-            prediction_data.get('prediction_month', 0),
-            prediction_data.get('r_squared', 0),
-            prediction_data.get('confidence', 'low'),
-            prediction_data.get('momentum', 0),
-            prediction_data.get('volatility', 0),
-            prediction_data.get('trend', 'stable'),
-            prediction_data.get('data_points', 0)
-        ))
+        cursor.execute(INSERT_PREDICTION_SQL, _prediction_params(prediction_data))
+
 
+@timed("db")
+def insert_predictions(predictions: Iterable[Dict], chunk_size: int = BATCH_CHUNK_SIZE) -> Dict[str, int]:
+    """Insert or update many trend predictions in one transaction"""
+    return _insert_many(INSERT_PREDICTION_SQL, map(_prediction_params, predictions), chunk_size)
 
+
+@timed("db")
 def get_prediction(topic: str) -> Optional[Dict]:
     """Get latest prediction for a topic"""
     with get_db() as conn:
@@ -257,6 +1115,241 @@ def get_prediction(topic: str) -> Optional[Dict]:
         return dict(row) if row else None
 
 
+@timed("db")
+def get_predictions(topics: List[str]) -> Dict[str, Dict]:
+    """Get stored predictions for multiple topics, keyed by topic"""
+    unique_topics = list(dict.fromkeys(topics))
+    predictions = {}
+    if not unique_topics:
+        return predictions
+    
+    with get_db() as conn:
+        conn.row_factory = dict_factory
+        cursor = conn.cursor()
+        # Stay under SQLite's bound-parameter limit for very large topic lists
+        for start in range(0, len(unique_topics), MAX_QUERY_PARAMS):
+            chunk = unique_topics[start:start + MAX_QUERY_PARAMS]
+            placeholders = ','.join(['?'] * len(chunk))
+            cursor.execute(f"""
+                SELECT * FROM trend_predictions 
+                WHERE topic IN ({placeholders})
+            """, tuple(chunk))
+            for row in cursor.fetchall():
+                predictions[row['topic']] = row
+    return predictions
+
+
+def _rollup(cursor, source_sql: str, table: str, bucket_seconds: int, cutoff: int) -> int:
+    """Merge source rows older than cutoff into a rollup table"""
+    cursor.execute(f"""
+        INSERT INTO {table} (topic, bucket_ts, domain, mean_score, min_score, max_score, count)
+        SELECT topic, (ts / {bucket_seconds}) * {bucket_seconds} as bucket, MAX(domain),
+               SUM(total) / SUM(count), MIN(low), MAX(high), SUM(count)
+        FROM ({source_sql}) source
+        WHERE ts < ?
+        GROUP BY topic, bucket
+        ON CONFLICT (topic, bucket_ts) DO UPDATE SET
+            mean_score = (mean_score * count + excluded.mean_score * excluded.count)
+                         / (count + excluded.count),
+            min_score = MIN(min_score, excluded.min_score),
+            max_score = MAX(max_score, excluded.max_score),
+            count = count + excluded.count
+    """, (cutoff,))
+    return cursor.rowcount
+
+
+@timed("db")
+def get_regression_stats(topics: List[str]) -> Dict[str, Dict]:
+    """
+    Get the running regression sums of several topics over the trailing
+    REGRESSION_WINDOW_DAYS.
+    
+    The stored sums cover the window before each topic's newest point, so
+    points that have aged out of the window since are subtracted here with
+    one range read of the covering index; the result covers the same points
+    as get_trend_history_series(topics, REGRESSION_WINDOW_DAYS).
+    
+    Args:
+        topics: Topic names
+        
+    Returns:
+        Dictionary mapping topic to its trend_regression_stats row; n is 0
+        for topics whose history lies entirely before the window, and
+        topics without history are absent
+    """
+    unique_topics = list(dict.fromkeys(topics))
+    cutoff = _history_cutoff(REGRESSION_WINDOW_DAYS)
+    x = "((h.recorded_ts - s.origin_ts) / 86400.0)"
+    stats = {}
+    with get_db() as conn:
+        conn.row_factory = dict_factory
+        cursor = conn.cursor()
+        for start in range(0, len(unique_topics), MAX_QUERY_PARAMS):
+            chunk = unique_topics[start:start + MAX_QUERY_PARAMS]
+            placeholders = ','.join(['?'] * len(chunk))
+            cursor.execute(f"""
+                SELECT s.topic, s.n - COUNT(h.recorded_ts) as n,
+                       s.sum_x - TOTAL({x}) as sum_x,
+                       s.sum_y - TOTAL(h.trend_score) as sum_y,
+                       s.sum_xy - TOTAL({x} * h.trend_score) as sum_xy,
+                       s.sum_xx - TOTAL({x} * {x}) as sum_xx,
+                       s.sum_yy - TOTAL(h.trend_score * h.trend_score) as sum_yy,
+                       s.origin_ts, MAX(s.window_start_ts, ?1) as window_start_ts, s.last_ts
+                FROM trend_regression_stats s
+                LEFT JOIN trend_history h
+                ON h.topic = s.topic AND h.recorded_ts >= s.window_start_ts AND h.recorded_ts < ?1
+                WHERE s.topic IN ({placeholders})
+                GROUP BY s.topic
+            """, (cutoff, *chunk))
+            for row in cursor.fetchall():
+                stats[row['topic']] = row
+    return stats
+
+
+@timed("db")
+def compact_history(now: Optional[int] = None) -> Dict[str, int]:
+    """
+    Roll expired history into coarser tiers and release the freed pages.
+    
+    Raw points older than RAW_RETENTION_DAYS are merged into hourly buckets,
+    hourly buckets older than HOURLY_RETENTION_DAYS into daily buckets, and
+    daily buckets older than DAILY_RETENTION_DAYS are dropped. Rollups keep
+    the mean, min, max and count of the points they replace.
+    
+    Args:
+        now: Reference time in epoch seconds (defaults to the current time)
+        
+    Returns:
+        Dictionary with the number of rows rolled up and deleted per tier
+    """
+    now = int(time.time()) if now is None else now
+    (hourly_table, hour), (daily_table, day) = ROLLUP_TIERS
+    stats = {}
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        
+        # Bucket-aligned cutoffs so no bucket is split between tiers
+        if RAW_RETENTION_DAYS:
+            raw_cutoff = (now - RAW_RETENTION_DAYS * 86400) // hour * hour
+            stats["hourly_buckets"] = _rollup(cursor, """
+                SELECT topic, recorded_ts as ts, domain, trend_score as total, 1 as count,
+                       trend_score as low, trend_score as high
+                FROM trend_history
+            """, hourly_table, hour, raw_cutoff)
+            cursor.execute("DELETE FROM trend_history WHERE recorded_ts < ?", (raw_cutoff,))
+            stats["raw_deleted"] = cursor.rowcount
+        
+        if HOURLY_RETENTION_DAYS:
+            hourly_cutoff = (now - HOURLY_RETENTION_DAYS * 86400) // day * day
+            stats["daily_buckets"] = _rollup(cursor, f"""
+                SELECT topic, bucket_ts as ts, domain, mean_score * count as total, count,
+                       min_score as low, max_score as high
+                FROM {hourly_table}
+            """, daily_table, day, hourly_cutoff)
+            cursor.execute(f"DELETE FROM {hourly_table} WHERE bucket_ts < ?", (hourly_cutoff,))
+            stats["hourly_deleted"] = cursor.rowcount
+        
+        if DAILY_RETENTION_DAYS:
+            cursor.execute(f"DELETE FROM {daily_table} WHERE bucket_ts < ?",
+                           (now - DAILY_RETENTION_DAYS * 86400,))
+            stats["daily_deleted"] = cursor.rowcount
+        conn.commit()
+        
+        cursor.execute("PRAGMA auto_vacuum")
+        if cursor.fetchone()[0] != 2:
+            # One-time conversion of databases created before incremental vacuum
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+        cursor.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES})")
+        cursor.fetchall()
+    
+    return stats
+
+
+@timed("db")
+def get_last_history_ts(topics: List[str]) -> Dict[str, int]:
+    """Get the epoch seconds of each topic's newest history point; topics without history are absent"""
+    unique_topics = list(dict.fromkeys(topics))
+    last_ts = {}
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(unique_topics), MAX_QUERY_PARAMS):
+            chunk = unique_topics[start:start + MAX_QUERY_PARAMS]
+            placeholders = ','.join(['?'] * len(chunk))
+            cursor.execute(f"""
+                SELECT topic, MAX(recorded_ts) FROM trend_history
+                WHERE topic IN ({placeholders})
+                GROUP BY topic
+            """, chunk)
+            last_ts.update(cursor.fetchall())
+    return last_ts
+
+
+@timed("db")
+def get_stale_forecast_topics() -> List[Dict]:
+    """
+    Get topics whose history is newer than their stored prediction.
+    
+    Predictions record their topic's newest point even when it has left the
+    regression window, so quiet topics are not refit again until new history
+    arrives; topics without a prediction are always stale.
+    """
+    with get_db() as conn:
+        conn.row_factory = dict_factory
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT h.topic, h.last_ts,
+                   (SELECT domain FROM trend_history
+                    WHERE topic = h.topic AND recorded_ts = h.last_ts LIMIT 1) as domain
+            FROM (
+                SELECT topic, MAX(recorded_ts) as last_ts
+                FROM trend_history
+                GROUP BY topic
+            ) h
+            LEFT JOIN trend_predictions p ON p.topic = h.topic
+            WHERE h.last_ts > COALESCE({EPOCH_SQL.format('p.history_until')}, 0)
+        """)
+        return [dict(row) for row in cursor.fetchall()]
+
+
+def get_topic_domains(rules_version: str, limit: int) -> Dict[str, tuple]:
+    """Get persisted classifications made with the given rules version"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT topic, domain, confidence FROM topic_domain
+            WHERE rules_version = ?
+            ORDER BY classified_at DESC
+            LIMIT ?
+        """, (rules_version, limit))
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+def insert_topic_domains(classifications: Dict[str, tuple], rules_version: str) -> Dict[str, int]:
+    """Insert or update persisted classifications, keyed by normalized topic"""
+    return _insert_many(
+        """
+        INSERT OR REPLACE INTO topic_domain (topic, domain, confidence, rules_version)
+        VALUES (?, ?, ?, ?)
+        """,
+        ((topic, domain, confidence, rules_version)
+         for topic, (domain, confidence) in classifications.items()),
+        BATCH_CHUNK_SIZE
+    )
+
+
+def delete_topic_domains(keep_rules_version: Optional[str] = None) -> int:
+    """Delete persisted classifications, except those of keep_rules_version"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM topic_domain WHERE rules_version IS NOT ?",
+            (keep_rules_version,)
+        )
+        return cursor.rowcount
+
+
 # Initialize database on import
 if not os.path.exists(DB_PATH):
     init_database()
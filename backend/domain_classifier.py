@@ -6,8 +6,19 @@ This module uses keyword matching and pattern recognition to classify
 trends into relevant business domains for better analysis and visualization.
 """
 
+import hashlib
+import json
+import os
 import re
-from typing import Dict, List, Tuple
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Maximum number of normalized topics kept in the in-memory classification cache
+CLASSIFICATION_CACHE_SIZE = int(os.getenv("TRENDLYTIX_CLASSIFIER_CACHE_SIZE", "10000"))
+
+# Persist classify_batch results to the topic_domain table so restarts start warm
+PERSIST_CLASSIFICATIONS = os.getenv("TRENDLYTIX_PERSIST_CLASSIFICATIONS", "1") == "1"
 
 # Domain keywords and patterns for classification
 DOMAIN_KEYWORDS = {
@@ -85,10 +96,231 @@ SPECIAL_CASES = {
 }
 
 
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton that finds every keyword occurring in a text
+    in a single pass, including overlapping and nested matches.
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        
+        for keyword in keywords:
+            self._add(keyword)
+        self._build_failure_links()
+    
+    def _add(self, keyword: str):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if keyword not in self._output[state]:
+            self._output[state] += (keyword,)
+    
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Keywords that end here also include those ending at the failure state
+                self._output[next_state] += self._output[self._fail[next_state]]
+    
+    def find_all(self, text: str) -> Set[str]:
+        """
+        Find the distinct keywords contained in text.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            Set of matched keywords
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class ClassificationCache:
+    """Thread-safe LRU cache of classifications keyed by normalized topic"""
+    
+    def __init__(self, maxsize: int = CLASSIFICATION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Look up a classification, counting the hit or miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: Tuple[str, float]):
+        """Store a classification, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def update(self, entries: Dict[str, Tuple[str, float]]):
+        """Store many classifications without touching the hit/miss counters"""
+        for key, value in entries.items():
+            self.put(key, value)
+    
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict:
+        """Get cache size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+_cache = ClassificationCache()
+_cache_warmed = False
+_database = None
+
+
+def _get_database():
+    """Import the database module lazily; None disables persistence"""
+    global _database, PERSIST_CLASSIFICATIONS
+    if _database is None and PERSIST_CLASSIFICATIONS:
+        try:
+            import database
+            _database = database
+        except ImportError as e:
+            print(f"Classification cache persistence disabled: {e}")
+            PERSIST_CLASSIFICATIONS = False
+    return _database if PERSIST_CLASSIFICATIONS else None
+
+
+def _rules_fingerprint() -> str:
+    """Content hash of the classification rules; changes whenever they change"""
+    rules = json.dumps([DOMAIN_KEYWORDS, SPECIAL_CASES], ensure_ascii=False)
+    return hashlib.sha1(rules.encode("utf-8")).hexdigest()
+
+
+def _build_matcher():
+    """Compile DOMAIN_KEYWORDS and SPECIAL_CASES into one automaton plus lookup tables"""
+    global _AUTOMATON, _SPECIAL_CASE_RANKS, _KEYWORD_DOMAINS, _DOMAIN_ORDER, RULES_VERSION
+    
+    # Special cases are checked in declaration order; the first match wins
+    special_ranks = {}
+    for rank, (special_topic, domain) in enumerate(SPECIAL_CASES.items()):
+        special_ranks.setdefault(special_topic.lower(), (rank, domain))
+    
+    # Keywords listed twice in a domain count twice, as in a per-keyword scan
+    keyword_domains: Dict[str, Dict[str, int]] = {}
+    for domain, keywords in DOMAIN_KEYWORDS.items():
+        for keyword in keywords:
+            counts = keyword_domains.setdefault(keyword.lower(), {})
+            counts[domain] = counts.get(domain, 0) + 1
+    
+    _AUTOMATON = KeywordAutomaton(list(special_ranks) + list(keyword_domains))
+    _SPECIAL_CASE_RANKS = special_ranks
+    _KEYWORD_DOMAINS = keyword_domains
+    _DOMAIN_ORDER = list(DOMAIN_KEYWORDS)
+    RULES_VERSION = _rules_fingerprint()
+
+
+_build_matcher()
+
+
+def reload_rules() -> bool:
+    """
+    Recompile the matcher after DOMAIN_KEYWORDS or SPECIAL_CASES change.
+    
+    Returns:
+        True if the rules changed and cached classifications were invalidated
+    """
+    global _cache_warmed
+    previous_version = RULES_VERSION
+    _build_matcher()
+    if RULES_VERSION == previous_version:
+        return False
+    
+    _cache.clear()
+    _cache_warmed = False
+    database = _get_database()
+    if database:
+        try:
+            database.delete_topic_domains(keep_rules_version=RULES_VERSION)
+        except Exception as e:
+            print(f"Classification cache invalidation error: {e}")
+    return True
+
+
+def _warm_cache():
+    """Load classifications persisted under the current rules version"""
+    global _cache_warmed
+    if _cache_warmed:
+        return
+    _cache_warmed = True
+    database = _get_database()
+    if not database:
+        return
+    try:
+        _cache.update(database.get_topic_domains(RULES_VERSION, _cache.maxsize))
+    except Exception as e:
+        print(f"Classification cache load error: {e}")
+
+
+def _persist(classifications: Dict[str, Tuple[str, float]]):
+    """Write new classifications through to the topic_domain table"""
+    database = _get_database() if classifications else None
+    if not database:
+        return
+    try:
+        database.insert_topic_domains(classifications, RULES_VERSION)
+    except Exception as e:
+        print(f"Classification cache persist error: {e}")
+
+
 def classify_topic(topic: str) -> Tuple[str, float]:
     """
     Classify a topic into a domain and return confidence score.
     
+    Only the in-memory cache is consulted and filled; classify_batch loads
+    and persists the topic_domain table.
+    
     Args:
         topic: The trend topic to classify
         
@@ -96,22 +328,47 @@ def classify_topic(topic: str) -> Tuple[str, float]:
         Tuple of (domain, confidence_score)
     """
     topic_lower = topic.lower().strip()
+    cached = _cache.get(topic_lower)
+    if cached is not None:
+        return cached
+    
+    result = _classify_normalized(topic_lower)
+    _cache.put(topic_lower, result)
+    return result
+
+
+def get_cache_stats() -> Dict:
+    """Get classification cache size and hit/miss counters"""
+    return {**_cache.stats(), "rules_version": RULES_VERSION}
+
+
+def clear_classification_cache():
+    """Drop in-memory classifications (persisted ones are reloaded by the next classify_batch)"""
+    global _cache_warmed
+    _cache.clear()
+    _cache_warmed = False
+
+
+def _classify_normalized(topic_lower: str) -> Tuple[str, float]:
+    """Classify an already lowercased and stripped topic"""
+    found = _AUTOMATON.find_all(topic_lower)
     
     # Check special cases first (100% confidence)
-    for special_topic, domain in SPECIAL_CASES.items():
-        if special_topic.lower() in topic_lower:
-            return domain, 1.0
+    special_matches = [_SPECIAL_CASE_RANKS[match] for match in found if match in _SPECIAL_CASE_RANKS]
+    if special_matches:
+        return min(special_matches)[1], 1.0
+    
+    # Count keyword matches per domain
+    domain_matches: Dict[str, int] = {}
+    for match in found:
+        for domain, count in _KEYWORD_DOMAINS.get(match, {}).items():
+            domain_matches[domain] = domain_matches.get(domain, 0) + count
     
-    # Check domain keywords
     best_match = None
     best_score = 0.0
     
-    for domain, keywords in DOMAIN_KEYWORDS.items():
-        # Count keyword matches
-        matches = 0
-        for keyword in keywords:
-            if keyword.lower() in topic_lower:
-                matches += 1
+    for domain in _DOMAIN_ORDER:
+        matches = domain_matches.get(domain, 0)
         
         if matches > 0:
             # Confidence based on number of matches
@@ -138,13 +395,25 @@ def classify_batch(topics: List[str]) -> Dict[str, Dict]:
     Returns:
         Dictionary mapping topic to {domain, confidence}
     """
+    _warm_cache()
     results = {}
+    new_classifications = {}
     for topic in topics:
-        domain, confidence = classify_topic(topic)
+        topic_lower = topic.lower().strip()
+        classification = _cache.get(topic_lower)
+        if classification is None:
+            classification = _classify_normalized(topic_lower)
+            _cache.put(topic_lower, classification)
+            new_classifications[topic_lower] = classification
+        
+        domain, confidence = classification
         results[topic] = {
             "domain": domain,
             "confidence": confidence
         }
+    
+    # Persist the whole batch's misses in one transaction
+    _persist(new_classifications)
     return results
 
 
@@ -176,7 +445,8 @@ def get_all_domains() -> List[str]:
 
 
 if __name__ == "__main__":
-    # Test the classifier
+    # Test the classifier without touching the database
+    PERSIST_CLASSIFICATIONS = False
     test_topics = [
         "ChatGPT Update",
         "Donald Trump News",
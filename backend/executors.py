@@ -0,0 +1,102 @@
+"""
+Executors for the TrendLytix API
+Runs blocking SQLite reads and CPU-heavy model fitting off the event loop,
+each on its own thread pool so queued forecasting never delays plain reads
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from database import POOL_SIZE
+
+# Threads serving database reads; matches the connection pool by default so
+# every reader keeps a warm pooled connection
+DB_READ_WORKERS = int(os.getenv("TRENDLYTIX_DB_READ_WORKERS", str(POOL_SIZE)))
+
+# Threads fitting forecasts, and how many fits may wait for one of them
+ML_WORKERS = int(os.getenv("TRENDLYTIX_ML_WORKERS", "2"))
+ML_QUEUE_SIZE = int(os.getenv("TRENDLYTIX_ML_QUEUE_SIZE", "32"))
+
+
+class BoundedExecutor:
+    """
+    Thread pool awaited from async code, with a cap on in-flight jobs.
+
+    Once max_workers + max_queued jobs are running or waiting, further
+    callers wait on the event loop instead of piling work into the pool.
+    The pool is created on first use and can be shut down and reused.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queued: Optional[int] = None):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queued = max_queued
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+            return self._executor
+
+    def _get_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if self.max_queued is None:
+            return None
+        # asyncio primitives belong to one loop; rebuild if the server restarted
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_workers + self.max_queued)
+        return self._semaphore
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on the pool and await its result.
+
+        Args:
+            func: Blocking callable
+            *args, **kwargs: Passed through to func
+
+        Returns:
+            Whatever func returns; its exceptions propagate to the caller
+        """
+        call = functools.partial(func, *args, **kwargs)
+        semaphore = self._get_semaphore()
+        if semaphore is None:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool's threads; the next run() starts a fresh pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+db_executor = BoundedExecutor("db-reader", DB_READ_WORKERS)
+ml_executor = BoundedExecutor("ml-worker", ML_WORKERS, ML_QUEUE_SIZE)
+
+
+async def run_db(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await a blocking database call on the reader pool"""
+    return await db_executor.run(func, *args, **kwargs)
+
+
+async def run_ml(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Await a model fit on the bounded ML pool"""
+    return await ml_executor.run(func, *args, **kwargs)
+
+
+def shutdown_executors():
+    """Stop both pools, e.g. when the server shuts down"""
+    ml_executor.shutdown()
+    db_executor.shutdown()
@@ -0,0 +1,90 @@
+"""
+Fast JSON responses for TrendLytix API
+Encodes endpoint payloads straight to bytes, skipping FastAPI's jsonable_encoder;
+uses orjson when installed and the standard library otherwise. Either way the
+encoding is recorded under the serialize stage.
+"""
+
+import functools
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from metrics import timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Opt-in: payloads are plain dicts/lists/scalars, which is all this path handles
+FAST_JSON = os.getenv("TRENDLYTIX_FAST_JSON", "0") == "1"
+
+
+def _default(value: Any) -> Any:
+    """Encode the few non-JSON types payloads can carry"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+@timed("serialize", "fast_json")
+def dumps(content: Any) -> bytes:
+    """
+    Serialize a payload to compact UTF-8 JSON.
+
+    Args:
+        content: Dicts, lists and scalars, possibly with numpy values or datetimes
+
+    Returns:
+        Encoded JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False,
+                      allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@timed("serialize", "json")
+def standard_response(content: Any, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """Encode a payload the way FastAPI does by default: jsonable_encoder, then JSONResponse"""
+    return JSONResponse(jsonable_encoder(content), headers=headers)
+
+
+def fast_json(endpoint: Callable) -> Callable:
+    """
+    Return an async endpoint's payload as a FastJSONResponse when FAST_JSON is
+    on, and through standard_response otherwise.
+
+    Headers set on the endpoint's injected Response (e.g. ETag) are carried
+    over; Response objects returned by the endpoint pass through untouched.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        payload = await endpoint(*args, **kwargs)
+        if isinstance(payload, Response):
+            return payload
+        response = kwargs.get("response")
+        headers = dict(response.headers) if isinstance(response, Response) else None
+        if not FAST_JSON:
+            return standard_response(payload, headers)
+        return FastJSONResponse(payload, headers=headers)
+    return wrapper
@@ -0,0 +1,205 @@
+"""
+Background forecast job for TrendLytix
+Fits trend models when new history arrives and stores them in trend_predictions,
+so API requests read precomputed forecasts instead of retraining
+"""
+
+import math
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from database import (
+    RAW_RETENTION_DAYS, REGRESSION_WINDOW_DAYS, epoch_to_timestamp, get_last_history_ts,
+    get_regression_stats, get_trend_history_series, get_stale_forecast_topics, insert_predictions
+)
+from ml.predictor import BatchTrendPredictor, FittedTrendModel, ProcessPoolTrendPredictor
+from scheduler import PeriodicWorker
+
+# Seconds between scans for topics with new history
+FORECAST_INTERVAL_SECONDS = int(os.getenv("TRENDLYTIX_FORECAST_INTERVAL", "300"))
+
+# Worker processes for fitting large topic sets (0 fits in-process)
+FORECAST_PROCESSES = int(os.getenv("TRENDLYTIX_FORECAST_PROCESSES", "0"))
+
+# Smallest shard worth sending to a worker process
+FORECAST_MIN_SHARD = int(os.getenv("TRENDLYTIX_FORECAST_MIN_SHARD", "64"))
+
+# Fit from the running regression sums kept on ingest (1) instead of
+# re-reading and refitting each topic's history window (0). Worker processes
+# only run refits, so refitting is the default once they are enabled
+INCREMENTAL_FORECASTS = os.getenv(
+    "TRENDLYTIX_INCREMENTAL_FORECASTS", "0" if FORECAST_PROCESSES > 0 else "1"
+) == "1"
+
+# The running sums cover raw points only, so compaction inside the window
+# would silently drop points from them; refit from the rollups instead
+if INCREMENTAL_FORECASTS and RAW_RETENTION_DAYS and RAW_RETENTION_DAYS < REGRESSION_WINDOW_DAYS:
+    print(f"[WARN] TRENDLYTIX_RAW_RETENTION_DAYS={RAW_RETENTION_DAYS} is shorter than "
+          f"TRENDLYTIX_REGRESSION_WINDOW_DAYS={REGRESSION_WINDOW_DAYS}; refitting forecasts "
+          f"from history instead of the running sums")
+    INCREMENTAL_FORECASTS = False
+if INCREMENTAL_FORECASTS and FORECAST_PROCESSES > 0:
+    print(f"[WARN] TRENDLYTIX_FORECAST_PROCESSES={FORECAST_PROCESSES} has no effect while "
+          f"TRENDLYTIX_INCREMENTAL_FORECASTS=1 fits forecasts from the running sums")
+
+_predictor = (
+    ProcessPoolTrendPredictor(FORECAST_PROCESSES, FORECAST_MIN_SHARD)
+    if FORECAST_PROCESSES > 0 else BatchTrendPredictor()
+)
+
+
+def build_forecasts(topics: List[Tuple[str, str, Tuple[np.ndarray, np.ndarray]]],
+                    last_ts: Optional[Dict[str, int]] = None) -> List[Dict]:
+    """
+    Fit the trend model for many topics at once and build their trend_predictions rows.
+
+    Args:
+        topics: (topic, domain, series) tuples, where series is the
+            (epoch seconds, trend scores) arrays from get_trend_history_series
+        last_ts: Newest history point of each topic in epoch seconds, from
+            get_last_history_ts; defaults to the newest point of each series
+
+    Returns:
+        One dictionary per topic matching the trend_predictions columns
+    """
+    results = _predictor.predict_series([series for _, _, series in topics])
+
+    forecasts = []
+    for (topic, domain, (timestamps, scores)), result in zip(topics, results):
+        if last_ts is not None:
+            until = last_ts.get(topic)
+        else:
+            until = int(timestamps[-1]) if len(timestamps) else None
+        forecast = {
+            'topic': topic,
+            'domain': domain or 'Other',
+            'data_points': len(timestamps),
+            'history_until': epoch_to_timestamp(until) if until is not None else None
+        }
+
+        if result.get('status') == 'success':
+            forecast.update({
+                'prediction_tomorrow': result['predictions_1day'][-1]['predicted_score'],
+                'prediction_week': result['predictions_7day'][-1]['predicted_score'],
+                'prediction_month': result['predictions_30day'][-1]['predicted_score'],
+                'r_squared': result['model_r_squared'],
+                'confidence': result['confidence'],
+                'momentum': result['slope'],
+                'volatility': round(float(np.std(scores)), 4),
+                'trend': result['trend_direction']
+            })
+        forecasts.append(forecast)
+
+    return forecasts
+
+
+def build_forecasts_from_stats(topics: List[Tuple[str, str]], stats: Dict[str, Dict]) -> List[Dict]:
+    """
+    Build trend_predictions rows from running regression sums, in O(1) per topic.
+    
+    Args:
+        topics: (topic, domain) tuples
+        stats: trend_regression_stats rows by topic, from get_regression_stats
+        
+    Returns:
+        One dictionary per topic matching the trend_predictions columns
+    """
+    forecasts = []
+    for topic, domain in topics:
+        row = stats.get(topic)
+        forecast = {
+            'topic': topic,
+            'domain': domain or 'Other',
+            'data_points': row['n'] if row else 0,
+            'history_until': epoch_to_timestamp(row['last_ts']) if row else None
+        }
+        
+        model = FittedTrendModel.from_sufficient_stats(
+            row['n'], row['sum_x'], row['sum_y'], row['sum_xy'], row['sum_xx'], row['sum_yy'],
+            last_x=(row['last_ts'] - row['origin_ts']) / 86400,
+            last_time=datetime.fromtimestamp(row['last_ts'], timezone.utc).replace(tzinfo=None)
+        ) if row else None
+        
+        if model is not None:
+            result = model.forecast((1, 7, 30))
+            variance = row['sum_yy'] / row['n'] - model.y_mean ** 2
+            forecast.update({
+                'prediction_tomorrow': result['predictions_1day'][-1]['predicted_score'],
+                'prediction_week': result['predictions_7day'][-1]['predicted_score'],
+                'prediction_month': result['predictions_30day'][-1]['predicted_score'],
+                'r_squared': result['model_r_squared'],
+                'confidence': result['confidence'],
+                'momentum': model.train_metrics()['slope'],
+                'volatility': round(math.sqrt(max(0.0, variance)), 4),
+                'trend': model.trend_direction
+            })
+        forecasts.append(forecast)
+    
+    return forecasts
+
+
+def refresh_topics(topics: List[Tuple[str, str]]) -> List[Dict]:
+    """
+    Fit and store forecasts for several topics in one batch.
+
+    Args:
+        topics: (topic, domain) tuples
+
+    Returns:
+        The stored forecasts, in the same order
+    """
+    names = [topic for topic, _ in topics]
+    if INCREMENTAL_FORECASTS:
+        forecasts = build_forecasts_from_stats(topics, get_regression_stats(names))
+    else:
+        series = get_trend_history_series(names, days=REGRESSION_WINDOW_DAYS)
+        forecasts = build_forecasts([
+            (topic, domain, series[topic]) for topic, domain in topics
+        ], get_last_history_ts(names))
+    insert_predictions(forecasts)
+    return forecasts
+
+
+def refresh_topic(topic: str, domain: str = 'Other') -> Dict:
+    """Fit and store the forecast for a single topic"""
+    return refresh_topics([(topic, domain)])[0]
+
+
+def refresh_stale_forecasts() -> int:
+    """
+    Refit every topic whose history is newer than its stored forecast.
+
+    Returns:
+        Number of forecasts refreshed
+    """
+    stale = get_stale_forecast_topics()
+    if not stale:
+        return 0
+    return len(refresh_topics([(row['topic'], row.get('domain') or 'Other') for row in stale]))
+
+
+def shutdown_forecast_processes():
+    """Stop forecasting worker processes, if any were started"""
+    if isinstance(_predictor, ProcessPoolTrendPredictor):
+        _predictor.shutdown()
+
+
+class ForecastWorker(PeriodicWorker):
+    """Daemon thread that keeps trend_predictions in sync with trend_history"""
+
+    def __init__(self, interval: int = FORECAST_INTERVAL_SECONDS):
+        super().__init__("forecast-worker", self._refresh, interval)
+
+    @staticmethod
+    def _refresh():
+        refreshed = refresh_stale_forecasts()
+        if refreshed:
+            print(f"[OK] Refreshed {refreshed} forecasts")
+
+
+if __name__ == "__main__":
+    count = refresh_stale_forecasts()
+    print(f"[OK] Refreshed {count} forecasts")
@@ -0,0 +1,179 @@
+"""
+Performance metrics for TrendLytix
+In-process histograms and counters, rendered in the Prometheus text format
+"""
+
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Instrumentation toggle; when off, timed() returns functions unwrapped and
+# nothing is recorded
+METRICS_ENABLED = os.getenv("TRENDLYTIX_METRICS", "1") == "1"
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with optional labels"""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    labels = _format_labels(self.labels, label_values, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {total:.6f}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# Time per processing stage (db, fit, predict, enrich, serialize, request),
+# labelled with the function or route measured
+STAGE_SECONDS = Histogram(
+    "trendlytix_stage_seconds", "Time spent in each processing stage", ("stage", "name")
+)
+
+# Notable events, e.g. mock-data fallbacks and 304 responses
+EVENTS = Counter("trendlytix_events_total", "Count of notable events", ("event", "name"))
+
+# Values read from other components at scrape time: (name, type, help, callback)
+_callbacks: List[Tuple[str, str, str, Callable[[], float]]] = []
+
+
+def timed(stage: str, name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording each call's duration in STAGE_SECONDS.
+
+    Works on plain and async functions. With metrics disabled the function
+    is returned as-is, so instrumentation costs nothing.
+
+    Args:
+        stage: Stage label, e.g. 'db' or 'fit'
+        name: Name label (defaults to the function name)
+    """
+    def decorator(func: Callable) -> Callable:
+        if not METRICS_ENABLED:
+            return func
+        label = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    STAGE_SECONDS.observe(time.perf_counter() - started, stage, label)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage, label)
+        return wrapper
+    return decorator
+
+
+def observe(stage: str, name: str, seconds: float):
+    """Record a duration measured by the caller"""
+    if METRICS_ENABLED:
+        STAGE_SECONDS.observe(seconds, stage, name)
+
+
+def count(event: str, name: str = "", amount: float = 1):
+    """Increment an event counter"""
+    if METRICS_ENABLED:
+        EVENTS.inc(event, name, amount=amount)
+
+
+def register_callback(name: str, metric_type: str, help_text: str, callback: Callable[[], float]):
+    """
+    Expose a value owned by another component, read on every scrape.
+
+    Args:
+        name: Metric name
+        metric_type: 'counter' or 'gauge'
+        help_text: HELP line
+        callback: Returns the current value
+    """
+    _callbacks.append((name, metric_type, help_text, callback))
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = STAGE_SECONDS.render() + EVENTS.render()
+    for name, metric_type, help_text, callback in _callbacks:
+        try:
+            value = callback()
+        except Exception as e:
+            print(f"Metrics callback {name} error: {e}")
+            continue
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}", f"{name} {value:g}"])
+    return "\n".join(lines) + "\n"
@@ -3,18 +3,29 @@ Linear Regression based Trend Predictor
 Predicts future trend scores using historical data
 """
 
+import math
 import numpy as np
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Tuple, Optional, Sequence
 import warnings
 
+from metrics import timed
+
 warnings.filterwarnings('ignore')
 
 
 class TrendPredictor:
-    """Linear regression predictor for trend forecasting"""
+    """
+    Linear regression predictor for trend forecasting.
+    
+    Instances hold mutable model state between train() and predict(), so
+    they must not be shared across threads; use fit() for concurrent callers.
+    """
     
     def __init__(self):
         self.model = LinearRegression()
@@ -222,3 +233,495 @@ class TrendPredictor:
             "r_squared": round(self.r_squared, 4),
             "confidence": self._get_confidence_level(self.r_squared)
         }
+
+
+class BatchTrendPredictor:
+    """
+    Vectorized linear regression forecaster for many topics at once.
+    
+    Fits every topic with one closed-form least-squares pass over a padded
+    history matrix and produces the whole forecast horizon as one broadcasted
+    matrix. Results match TrendPredictor.train/predict_batch per topic.
+    """
+    
+    HORIZON_DAYS = 30
+    
+    @staticmethod
+    def prepare_batch(histories: List[List[Dict]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Optional[datetime]]]:
+        """
+        Pad topic histories into aligned arrays.
+        
+        Args:
+            histories: One list of dicts with 'timestamp' and 'trend_score' per topic
+            
+        Returns:
+            X: Days from each topic's first point, shape (topics, max_points)
+            y: Trend scores, same shape as X
+            mask: True where X and y hold a real data point
+            last_times: Timestamp of each topic's last point (None if empty)
+        """
+        # At least one column so empty histories still index cleanly
+        max_points = max([1] + [len(history) for history in histories])
+        X = np.zeros((len(histories), max_points))
+        y = np.zeros((len(histories), max_points))
+        mask = np.zeros((len(histories), max_points), dtype=bool)
+        last_times = []
+        
+        for row, history in enumerate(histories):
+            if not history:
+                last_times.append(None)
+                continue
+            
+            sorted_data = sorted(history, key=lambda x: x['timestamp'])
+            times = [datetime.fromisoformat(point['timestamp']) for point in sorted_data]
+            n = len(times)
+            X[row, :n] = [(t - times[0]).total_seconds() / (24 * 3600) for t in times]
+            y[row, :n] = [point['trend_score'] for point in sorted_data]
+            mask[row, :n] = True
+            last_times.append(times[-1])
+        
+        return X, y, mask, last_times
+    
+    @staticmethod
+    def prepare_series(series: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Optional[datetime]]]:
+        """
+        Pad numeric topic histories into aligned arrays.
+        
+        Args:
+            series: One (epoch seconds, trend scores) pair of arrays per topic,
+                sorted by time, as returned by database.get_trend_history_series
+            
+        Returns:
+            Same as prepare_batch
+        """
+        max_points = max([1] + [len(timestamps) for timestamps, _ in series])
+        X = np.zeros((len(series), max_points))
+        y = np.zeros((len(series), max_points))
+        mask = np.zeros((len(series), max_points), dtype=bool)
+        last_times = []
+        
+        for row, (timestamps, scores) in enumerate(series):
+            n = len(timestamps)
+            if not n:
+                last_times.append(None)
+                continue
+            
+            X[row, :n] = (timestamps - timestamps[0]) / (24 * 3600)
+            y[row, :n] = scores
+            mask[row, :n] = True
+            last_times.append(datetime.fromtimestamp(int(timestamps[-1]), timezone.utc).replace(tzinfo=None))
+        
+        return X, y, mask, last_times
+    
+    @staticmethod
+    @timed("fit", "batch")
+    def fit(X: np.ndarray, y: np.ndarray, mask: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Fit ordinary least squares for every row in one pass.
+        
+        Args:
+            X, y, mask: Padded arrays from prepare_batch
+            
+        Returns:
+            Dictionary of per-topic arrays: data_points, x_mean, y_mean,
+            x_std, slope (per day), r_squared and last_x
+        """
+        weights = mask.astype(float)
+        n = weights.sum(axis=1)
+        safe_n = np.maximum(n, 1)
+        
+        x_mean = (X * weights).sum(axis=1) / safe_n
+        y_mean = (y * weights).sum(axis=1) / safe_n
+        dx = (X - x_mean[:, None]) * weights
+        dy = (y - y_mean[:, None]) * weights
+        
+        s_xx = (dx * dx).sum(axis=1)
+        s_xy = (dx * dy).sum(axis=1)
+        s_yy = (dy * dy).sum(axis=1)
+        
+        # A constant time axis has no slope (StandardScaler leaves it unscaled)
+        varying = s_xx > np.finfo(float).eps * np.maximum(np.abs(x_mean), 1) ** 2 * safe_n
+        slope = np.where(varying, s_xy / np.where(varying, s_xx, 1), 0.0)
+        
+        residuals = (dy - slope[:, None] * dx) * weights
+        ss_res = (residuals * residuals).sum(axis=1)
+        
+        # Same convention as sklearn's r2_score for constant targets
+        r_squared = np.where(
+            s_yy > 0,
+            1 - ss_res / np.where(s_yy > 0, s_yy, 1),
+            np.where(ss_res == 0, 1.0, 0.0)
+        )
+        
+        last_x = np.where(n > 0, X[np.arange(len(X)), np.maximum(n.astype(int) - 1, 0)], 0.0)
+        
+        return {
+            "data_points": n.astype(int),
+            "x_mean": x_mean,
+            "y_mean": y_mean,
+            "x_std": np.sqrt(s_xx / safe_n),
+            "slope": slope,
+            "r_squared": r_squared,
+            "last_x": last_x
+        }
+    
+    @classmethod
+    @timed("predict", "batch")
+    def forecast(cls, fit: Dict[str, np.ndarray], horizon: int = HORIZON_DAYS) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Forecast every topic over the full horizon.
+        
+        Args:
+            fit: Output of fit()
+            horizon: Number of days to forecast
+            
+        Returns:
+            scores: Clamped predicted scores, shape (topics, horizon)
+            margins: Confidence margin per topic, shape (topics,)
+        """
+        day_offsets = np.arange(1, horizon + 1)
+        future_x = fit["last_x"][:, None] + day_offsets[None, :]
+        scores = fit["y_mean"][:, None] + fit["slope"][:, None] * (future_x - fit["x_mean"][:, None])
+        scores = np.clip(scores, 0, 100)
+        margins = 5 * (1 - fit["r_squared"])
+        return scores, margins
+    
+    @classmethod
+    def fit_models(cls, histories: List[List[Dict]]) -> List[Optional["FittedTrendModel"]]:
+        """
+        Fit all topics at once and return one immutable model per topic.
+        
+        Args:
+            histories: One list of historical data points per topic
+            
+        Returns:
+            Fitted model per topic, or None where there are fewer than 2 points
+        """
+        X, y, mask, last_times = cls.prepare_batch(histories)
+        fit = cls.fit(X, y, mask)
+        
+        models = []
+        for row, last_time in enumerate(last_times):
+            if fit["data_points"][row] < 2:
+                models.append(None)
+                continue
+            models.append(FittedTrendModel(
+                slope=float(fit["slope"][row]),
+                x_mean=float(fit["x_mean"][row]),
+                y_mean=float(fit["y_mean"][row]),
+                x_std=float(fit["x_std"][row]),
+                r_squared=float(fit["r_squared"][row]),
+                data_points=int(fit["data_points"][row]),
+                last_x=float(fit["last_x"][row]),
+                last_time=last_time
+            ))
+        return models
+    
+    def predict_batch(self, histories: List[List[Dict]]) -> List[Dict]:
+        """
+        Train and forecast all topics at once.
+        
+        Args:
+            histories: One list of historical data points per topic
+            
+        Returns:
+            One result per topic, shaped like TrendPredictor.predict_batch plus
+            the training metrics from TrendPredictor.train
+        """
+        return self._predict_prepared(*self.prepare_batch(histories))
+    
+    def predict_series(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> List[Dict]:
+        """
+        Train and forecast all topics at once from numeric histories.
+        
+        Args:
+            series: One (epoch seconds, trend scores) pair of arrays per topic
+            
+        Returns:
+            Same as predict_batch
+        """
+        return self._predict_prepared(*self.prepare_series(series))
+    
+    def _predict_prepared(self, X: np.ndarray, y: np.ndarray, mask: np.ndarray,
+                          last_times: List[Optional[datetime]]) -> List[Dict]:
+        fit = self.fit(X, y, mask)
+        scores, margins = self.forecast(fit, self.HORIZON_DAYS)
+        
+        # Coefficient on the standardized time axis, as reported by TrendPredictor.train
+        scaled_slope = np.where(fit["x_std"] > 0, fit["slope"] * fit["x_std"], 0.0)
+        
+        results = []
+        for row, last_time in enumerate(last_times):
+            data_points = int(fit["data_points"][row])
+            if data_points < 2:
+                results.append({
+                    "status": "error",
+                    "message": "Need at least 2 data points to train"
+                })
+                continue
+            
+            r_squared = float(fit["r_squared"][row])
+            confidence = TrendPredictor._get_confidence_level(r_squared)
+            slope = float(scaled_slope[row])
+            predictions = _prediction_rows(scores[row], float(margins[row]), confidence, last_time)
+            
+            results.append({
+                "status": "success",
+                "data_points": data_points,
+                "slope": round(slope, 4),
+                "intercept": round(float(fit["y_mean"][row]), 2),
+                "trend_direction": "rising" if slope > 0 else ("falling" if slope < 0 else "stable"),
+                "predictions_1day": predictions[:1],
+                "predictions_7day": predictions[:7],
+                "predictions_30day": predictions,
+                "model_r_squared": round(r_squared, 4),
+                "confidence": confidence
+            })
+        
+        return results
+
+
+class ProcessPoolTrendPredictor(BatchTrendPredictor):
+    """
+    BatchTrendPredictor that shards large topic sets across worker processes.
+    
+    Each shard is sent as three flat NumPy buffers (all timestamps, all
+    scores, per-topic offsets) instead of per-point objects, and is fitted
+    with the vectorized batch path in its worker. Sets smaller than
+    min_topics_per_worker stay in-process, where pickling would cost more
+    than it saves.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, min_topics_per_worker: int = 64):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.min_topics_per_worker = max(1, min_topics_per_worker)
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a multi-threaded server process is not safe
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+    
+    def predict_series(self, series: List[Tuple[np.ndarray, np.ndarray]]) -> List[Dict]:
+        """
+        Train and forecast all topics, one shard per worker process.
+        
+        Args:
+            series: One (epoch seconds, trend scores) pair of arrays per topic
+            
+        Returns:
+            Same as BatchTrendPredictor.predict_series, in input order
+        """
+        shards = min(self.workers, len(series) // self.min_topics_per_worker)
+        if shards < 2:
+            return super().predict_series(series)
+        
+        bounds = np.linspace(0, len(series), shards + 1).astype(int)
+        futures = [
+            self._get_executor().submit(_predict_packed, *pack_series(series[start:end]))
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+    
+    def shutdown(self):
+        """Stop the worker processes; they are restarted on next use"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def pack_series(series: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flatten per-topic histories into contiguous buffers.
+    
+    Args:
+        series: One (epoch seconds, trend scores) pair of arrays per topic
+        
+    Returns:
+        timestamps: All int64 epoch seconds, topic after topic
+        scores: All float64 trend scores, aligned with timestamps
+        offsets: Start of each topic in the buffers, plus the total length
+    """
+    lengths = [len(timestamps) for timestamps, _ in series]
+    offsets = np.zeros(len(series) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if not series:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), offsets
+    timestamps = np.concatenate([np.asarray(ts, dtype=np.int64) for ts, _ in series])
+    scores = np.concatenate([np.asarray(sc, dtype=float) for _, sc in series])
+    return timestamps, scores, offsets
+
+
+def unpack_series(timestamps: np.ndarray, scores: np.ndarray,
+                  offsets: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Split buffers from pack_series back into per-topic views"""
+    return [
+        (timestamps[start:end], scores[start:end])
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+
+
+def _predict_packed(timestamps: np.ndarray, scores: np.ndarray, offsets: np.ndarray) -> List[Dict]:
+    """Worker-process entry point: fit one packed shard"""
+    return BatchTrendPredictor().predict_series(unpack_series(timestamps, scores, offsets))
+
+
+def _prediction_rows(scores: np.ndarray, margin: float, confidence: str, last_time: datetime) -> List[Dict]:
+    """Format one topic's forecast horizon like TrendPredictor.predict"""
+    predictions = []
+    for day_offset, predicted_score in enumerate(scores.tolist(), start=1):
+        # Already clipped; repeated so boundary values match TrendPredictor.predict exactly
+        predicted_score = max(0, min(100, predicted_score))
+        predictions.append({
+            "date": (last_time + timedelta(days=day_offset)).date().isoformat(),
+            "predicted_score": round(predicted_score, 2),
+            "upper_bound": round(min(100, predicted_score + margin), 2),
+            "lower_bound": round(max(0, predicted_score - margin), 2),
+            "confidence": confidence
+        })
+    return predictions
+
+
+@dataclass(frozen=True)
+class FittedTrendModel:
+    """
+    Immutable fitted trend line for one topic.
+    
+    Produced by fit(); holds no shared state, so a model can be forecast
+    from any number of threads at once.
+    """
+    
+    slope: float  # Score change per day
+    x_mean: float
+    y_mean: float
+    x_std: float
+    r_squared: float
+    data_points: int
+    last_x: float  # Days from the first to the last data point
+    last_time: datetime
+    
+    @property
+    def intercept(self) -> float:
+        """Fitted score at the first data point"""
+        return self.y_mean - self.slope * self.x_mean
+    
+    @property
+    def scaled_slope(self) -> float:
+        """Coefficient on the standardized time axis, as reported by TrendPredictor.train"""
+        return self.slope * self.x_std if self.x_std > 0 else 0.0
+    
+    @property
+    def trend_direction(self) -> str:
+        slope = self.scaled_slope
+        return "rising" if slope > 0 else ("falling" if slope < 0 else "stable")
+    
+    @property
+    def confidence(self) -> str:
+        return TrendPredictor._get_confidence_level(self.r_squared)
+    
+    @classmethod
+    @timed("fit", "sufficient_stats")
+    def from_sufficient_stats(cls, n: int, sum_x: float, sum_y: float, sum_xy: float,
+                              sum_xx: float, sum_yy: float, last_x: float,
+                              last_time: datetime) -> Optional["FittedTrendModel"]:
+        """
+        Build the least-squares fit from running sums in constant time.
+        
+        Args:
+            n, sum_x, sum_y, sum_xy, sum_xx, sum_yy: Count and sums over the
+                window's points, x in days from any fixed origin
+            last_x: x of the newest point
+            last_time: Timestamp of the newest point
+            
+        Returns:
+            Fitted model, or None with fewer than 2 points
+        """
+        if n < 2:
+            return None
+        x_mean = sum_x / n
+        y_mean = sum_y / n
+        # Centered sums; running totals can leave tiny negative rounding residue
+        s_xx = max(0.0, sum_xx - sum_x * x_mean)
+        s_xy = sum_xy - sum_x * y_mean
+        s_yy = max(0.0, sum_yy - sum_y * y_mean)
+        
+        # Same degenerate-case rules as BatchTrendPredictor.fit, with a
+        # tolerance for the cancellation in the subtractions above
+        tolerance = 1e-12
+        varying = s_xx > tolerance * max(sum_xx, 1.0)
+        slope = s_xy / s_xx if varying else 0.0
+        ss_res = max(0.0, s_yy - slope * s_xy)
+        if s_yy > tolerance * max(sum_yy, 1.0):
+            r_squared = 1 - ss_res / s_yy
+        else:
+            r_squared = 1.0 if ss_res <= tolerance * max(sum_yy, 1.0) else 0.0
+        
+        return cls(
+            slope=slope,
+            x_mean=x_mean,
+            y_mean=y_mean,
+            x_std=math.sqrt(s_xx / n) if varying else 0.0,
+            r_squared=r_squared,
+            data_points=int(n),
+            last_x=last_x,
+            last_time=last_time
+        )
+    
+    def train_metrics(self) -> Dict:
+        """Training metrics in the format returned by TrendPredictor.train"""
+        return {
+            "status": "success",
+            "data_points": self.data_points,
+            "r_squared": round(self.r_squared, 4),
+            "slope": round(self.scaled_slope, 4),
+            "intercept": round(self.y_mean, 2),
+            "trend_direction": self.trend_direction,
+            "confidence": self.confidence
+        }
+    
+    @timed("predict", "fitted_model")
+    def forecast(self, horizons: Sequence[int] = (1, 7, 30)) -> Dict:
+        """
+        Forecast the trend score for each horizon.
+        
+        Args:
+            horizons: Days ahead to forecast; the longest horizon is computed
+                once and the shorter ones are slices of it
+            
+        Returns:
+            Dictionary with a 'predictions_{n}day' list per horizon, shaped
+            like TrendPredictor.predict_batch
+        """
+        day_offsets = np.arange(1, max(horizons) + 1)
+        scores = np.clip(self.y_mean + self.slope * (self.last_x + day_offsets - self.x_mean), 0, 100)
+        margin = 5 * (1 - self.r_squared)
+        predictions = _prediction_rows(scores, margin, self.confidence, self.last_time)
+        
+        result = {"status": "success"}
+        for horizon in horizons:
+            result[f"predictions_{horizon}day"] = predictions[:horizon]
+        result["model_r_squared"] = round(self.r_squared, 4)
+        result["confidence"] = self.confidence
+        return result
+
+
+def fit(historical_data: List[Dict]) -> FittedTrendModel:
+    """
+    Fit a trend line to one topic's history.
+    
+    Args:
+        historical_data: List of dicts with 'timestamp' and 'trend_score'
+        
+    Returns:
+        Immutable fitted model
+    """
+    model = BatchTrendPredictor.fit_models([historical_data])[0]
+    if model is None:
+        raise ValueError("Need at least 2 data points to train")
+    return model
@@ -0,0 +1,109 @@
+"""
+Response cache for TrendLytix API
+Keeps computed endpoint payloads in memory until the underlying data changes
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Hashable, Mapping, Optional
+
+# Maximum number of cached (endpoint, parameters) payloads
+RESPONSE_CACHE_SIZE = int(os.getenv("TRENDLYTIX_RESPONSE_CACHE_SIZE", "256"))
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of endpoint payloads.
+    
+    Entries are keyed by endpoint and parameters and tagged with the data
+    version they were computed from; a lookup under a different version
+    is a miss, and the caller stores the recomputed payload with put().
+    """
+    
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """Return the payload cached for key under version, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+    
+    def put(self, key: Hashable, version: Hashable, payload: Any):
+        """Cache a payload computed from the given data version"""
+        with self._lock:
+            self._entries[key] = (version, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached payloads"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict:
+        """Get cache size and hit/miss counters"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+def make_etag(key: Hashable, version: Hashable) -> str:
+    """Strong ETag for an endpoint payload computed from the given data version"""
+    digest = hashlib.sha1(repr((key, version)).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def http_date(timestamp: Optional[str]) -> Optional[str]:
+    """Format a SQLite UTC timestamp ('YYYY-MM-DD HH:MM:SS') as an HTTP date"""
+    if not timestamp:
+        return None
+    parsed = datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc)
+    return format_datetime(parsed, usegmt=True)
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, last_modified: Optional[str]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current validators.
+    
+    Args:
+        headers: Request headers
+        etag: Current ETag
+        last_modified: Current Last-Modified HTTP date
+        
+    Returns:
+        True if the client's copy is current and a 304 should be sent
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence and uses weak comparison
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or any(
+            tag.removeprefix("W/") == etag for tag in candidates
+        )
+    
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
@@ -0,0 +1,31 @@
+"""
+History retention job for TrendLytix
+Periodically compacts trend_history into hourly and daily rollups
+"""
+
+import os
+
+from database import compact_history
+from scheduler import PeriodicWorker
+
+# Seconds between compaction runs
+COMPACTION_INTERVAL_SECONDS = int(os.getenv("TRENDLYTIX_COMPACTION_INTERVAL", "3600"))
+
+
+def run_compaction() -> dict:
+    """Compact history once and report what changed"""
+    stats = compact_history()
+    if any(stats.values()):
+        print(f"[OK] Compacted history: {stats}")
+    return stats
+
+
+class RetentionWorker(PeriodicWorker):
+    """Daemon thread that applies the history retention tiers"""
+
+    def __init__(self, interval: int = COMPACTION_INTERVAL_SECONDS):
+        super().__init__("retention-worker", run_compaction, interval)
+
+
+if __name__ == "__main__":
+    print(f"[OK] Compacted history: {compact_history()}")
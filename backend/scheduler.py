@@ -0,0 +1,41 @@
+"""
+Periodic background jobs for TrendLytix
+Runs maintenance tasks on a daemon thread while the API server is up
+"""
+
+import threading
+from typing import Callable, Optional
+
+
+class PeriodicWorker:
+    """Daemon thread that runs a task immediately and then every interval seconds"""
+
+    def __init__(self, name: str, task: Callable[[], object], interval: float):
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background loop"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Signal the loop to stop and wait for it"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.task()
+            except Exception as e:
+                print(f"{self.name} error: {e}")
+            self._stop_event.wait(self.interval)
@@ -0,0 +1,20 @@
+"""Shared fixtures; also makes the backend modules importable from the tests"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Point the database module at an empty temporary database"""
+    database.close_pool()
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "trendlytix.db"))
+    database.init_database()
+    yield database
+    database.close_pool()
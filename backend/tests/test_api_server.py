@@ -0,0 +1,52 @@
+"""Tests for the HTTP API"""
+
+import importlib
+import re
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(db):
+    """Test client over the temporary database, with an empty response cache"""
+    # Imported here so the module-level init_database() runs against the test database
+    api_server = importlib.import_module("api_server")
+    api_server.response_cache.clear()
+    return TestClient(api_server.app)
+
+
+def _seed(db, topics):
+    """Snapshots and a week of recent history, without stored forecasts"""
+    now = int(time.time())
+    db.insert_trend_snapshots(
+        {'topic': topic, 'trend_score': 0.5, 'trend_direction': 'rising', 'domain': 'Technology'}
+        for topic in topics
+    )
+    db.insert_trend_histories(
+        {'topic': topic, 'trend_score': 40.0 + day, 'recorded_at': db.epoch_to_timestamp(now - day * 86400)}
+        for topic in topics for day in range(7)
+    )
+
+
+@pytest.mark.parametrize("path", ["/api/trends", "/api/home/trending", "/api/dashboard/summary"])
+def test_etag_of_first_response_revalidates_after_forecasts_are_filled(db, client, path):
+    _seed(db, ["Alpha", "Beta"])
+
+    first = client.get(path)
+    assert first.status_code == 200
+    assert db.get_predictions(["Alpha", "Beta"]).keys() == {"Alpha", "Beta"}
+
+    second = client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+
+
+def test_metrics_report_every_stage_of_the_default_request_path(db, client):
+    _seed(db, ["Alpha", "Beta"])
+    client.get("/api/trends")
+
+    metrics = client.get("/metrics").text
+
+    stages = set(re.findall(r'^trendlytix_stage_seconds_count\{stage="(\w+)"', metrics, re.MULTILINE))
+    assert {"db", "fit", "predict", "enrich", "serialize", "request"} <= stages
@@ -0,0 +1,156 @@
+"""Tests for BatchTrendPredictor, its process-pool variant and the stateless fit() API"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from ml.predictor import BatchTrendPredictor, ProcessPoolTrendPredictor, TrendPredictor, fit
+
+
+def test_prepare_batch_all_empty_histories():
+    X, y, mask, last_times = BatchTrendPredictor.prepare_batch([[], []])
+
+    assert X.shape == (2, 1)
+    assert not mask.any()
+    assert last_times == [None, None]
+
+
+def test_predict_batch_all_empty_histories():
+    results = BatchTrendPredictor().predict_batch([[], [], []])
+
+    assert [result["status"] for result in results] == ["error"] * 3
+
+
+def test_predict_batch_mixes_empty_and_full_histories():
+    history = [
+        {'timestamp': f"2026-01-{day:02d}T00:00:00", 'trend_score': 10.0 + day}
+        for day in range(1, 11)
+    ]
+    results = BatchTrendPredictor().predict_batch([[], history])
+
+    assert results[0]["status"] == "error"
+    assert results[1]["status"] == "success"
+    assert results[1]["trend_direction"] == "rising"
+    assert len(results[1]["predictions_30day"]) == 30
+
+
+def _random_series(topics, seed=0):
+    """Numeric histories of varied length, including empty and single-point ones"""
+    rng = np.random.default_rng(seed)
+    series = []
+    for _ in range(topics):
+        n = int(rng.integers(0, 40))
+        timestamps = np.sort(rng.choice(np.arange(1767225600, 1767225600 + 60 * 86400, 3600), n, replace=False))
+        series.append((timestamps.astype(np.int64), rng.uniform(0, 100, n)))
+    return series
+
+
+def test_process_pool_matches_in_process_results():
+    series = _random_series(40)
+    predictor = ProcessPoolTrendPredictor(workers=2, min_topics_per_worker=8)
+    try:
+        pooled = predictor.predict_series(series)
+        # Two shards were fitted in worker processes
+        assert predictor._executor is not None
+    finally:
+        predictor.shutdown()
+
+    assert pooled == BatchTrendPredictor().predict_series(series)
+
+
+def _history(scores, hours=24, start=datetime(2026, 1, 1, 6, 30)):
+    """One point per step of the given number of hours"""
+    return [
+        {'timestamp': (start + timedelta(hours=hours * index)).isoformat(), 'trend_score': score}
+        for index, score in enumerate(scores)
+    ]
+
+
+def _noisy(points, seed):
+    rng = random.Random(seed)
+    return [round(rng.uniform(0, 100), 3) for _ in range(points)]
+
+
+HISTORIES = {
+    # Forecasts run past 100 and below 0 and must be clamped
+    "clamped_above": _history([80 + 2 * day for day in range(10)]),
+    "clamped_below": _history([30 - 3.5 * day for day in range(8)]),
+    # Fractional scores and irregular spacing exercise every rounding
+    "noisy": _history(_noisy(25, seed=1), hours=7),
+    "noisy_long": _history(_noisy(90, seed=2), hours=19),
+    "thirds": _history([100 / 3, 200 / 3, 50.005, 12.345]),
+    # Shortest fittable history, and too short to fit
+    "two_points": _history([10.0, 10.5]),
+    "one_point": _history([42.0]),
+    "empty": [],
+    # Flat scores have no slope, R² follows sklearn's constant-target rule
+    "flat": _history([55.5] * 12),
+    "flat_same_time": _history([20.0, 20.0, 20.0], hours=0),
+    # Input order must not matter
+    "unsorted": list(reversed(_history(_noisy(15, seed=3), hours=30))),
+}
+
+
+def _reference(history):
+    """TrendPredictor.train followed by predict_batch, merged into one result"""
+    predictor = TrendPredictor()
+    trained = predictor.train(history)
+    if trained["status"] != "success":
+        return trained
+    return {
+        **{key: trained[key] for key in ("status", "data_points", "slope", "intercept", "trend_direction")},
+        **predictor.predict_batch(history)
+    }
+
+
+def _series(history):
+    """The numeric (epoch seconds, scores) form read from the database"""
+    points = sorted(history, key=lambda point: point['timestamp'])
+    timestamps = [
+        int(datetime.fromisoformat(point['timestamp']).replace(tzinfo=timezone.utc).timestamp())
+        for point in points
+    ]
+    return np.array(timestamps, dtype=np.int64), np.array([point['trend_score'] for point in points], dtype=float)
+
+
+@pytest.mark.parametrize("name", sorted(HISTORIES))
+def test_predict_batch_matches_trend_predictor(name):
+    history = HISTORIES[name]
+    # Batched together with every other history, as in production
+    names = sorted(HISTORIES)
+    results = BatchTrendPredictor().predict_batch([HISTORIES[other] for other in names])
+
+    assert results[names.index(name)] == _reference(history)
+
+
+@pytest.mark.parametrize("name", sorted(HISTORIES))
+def test_predict_series_matches_trend_predictor(name):
+    history = HISTORIES[name]
+    names = sorted(HISTORIES)
+    results = BatchTrendPredictor().predict_series([_series(HISTORIES[other]) for other in names])
+
+    assert results[names.index(name)] == _reference(history)
+
+
+FITTABLE = sorted(name for name, history in HISTORIES.items() if len(history) >= 2)
+
+
+@pytest.mark.parametrize("name", FITTABLE)
+def test_fitted_model_matches_trend_predictor(name):
+    history = HISTORIES[name]
+    predictor = TrendPredictor()
+    trained = predictor.train(history)
+
+    model = fit(history)
+
+    assert model.train_metrics() == trained
+    assert model.forecast((1, 7, 30)) == predictor.predict_batch(history)
+    assert model.forecast((3,))["predictions_3day"] == predictor.predict(history, days_ahead=3)["predictions"]
+
+
+@pytest.mark.parametrize("name", ["empty", "one_point"])
+def test_fit_rejects_histories_too_short_to_train(name):
+    with pytest.raises(ValueError, match="at least 2 data points"):
+        fit(HISTORIES[name])
@@ -0,0 +1,19 @@
+"""Tests for the bulk-load CLI"""
+
+import bulk_load
+
+
+def test_snapshot_backfill_from_csv_keeps_file_timestamps(db, tmp_path):
+    path = tmp_path / "snapshots.csv"
+    path.write_text(
+        "topic,trend_score,computed_at\n"
+        "Alpha,0.8,2026-02-03 10:00:00\n"
+        "Alpha,0.1,2026-02-01 10:00:00\n"
+        "Alpha,0.4,2026-02-02 10:00:00\n",
+        encoding="utf-8"
+    )
+
+    assert bulk_load.main(["snapshots", str(path)]) == 0
+
+    latest = db.get_trend_by_topic("Alpha")
+    assert (latest.trend_score, latest.computed_at) == (0.8, "2026-02-03 10:00:00")
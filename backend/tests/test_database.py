@@ -0,0 +1,75 @@
+"""Tests for the SQLite storage layer"""
+
+import time
+
+import database
+
+
+def test_get_predictions_chunks_large_topic_lists(db):
+    topics = [f"Topic {index}" for index in range(db.MAX_QUERY_PARAMS * 2 + 5)]
+    db.insert_predictions({'topic': topic, 'prediction_week': 50} for topic in topics[::3])
+
+    predictions = db.get_predictions(topics)
+
+    assert set(predictions) == set(topics[::3])
+    assert predictions[topics[3]]['prediction_week'] == 50
+
+
+def _history_points(topic, days, now):
+    """One point per day for the given number of days, ending at now"""
+    return [
+        {'topic': topic, 'trend_score': float(day), 'recorded_at': database.epoch_to_timestamp(now - day * 86400)}
+        for day in range(days)
+    ]
+
+
+def test_compact_history_keeps_raw_points_when_raw_retention_is_zero(db, monkeypatch):
+    monkeypatch.setattr(db, "RAW_RETENTION_DAYS", 0)
+    now = int(time.time())
+    db.insert_trend_histories(_history_points("AI Summit", 400, now))
+
+    stats = db.compact_history(now)
+
+    assert "raw_deleted" not in stats
+    assert len(db.get_trend_history("AI Summit", days=400)) == 400
+    assert db._history_resolution(1) is None
+    assert db._history_resolution(400) is None
+
+
+def test_compact_history_rolls_up_expired_raw_points(db, monkeypatch):
+    monkeypatch.setattr(db, "RAW_RETENTION_DAYS", 30)
+    now = int(time.time()) // 3600 * 3600
+    db.insert_trend_histories(_history_points("AI Summit", 60, now))
+
+    stats = db.compact_history(now)
+
+    # Days 31-59 fall before the cutoff; day 30 sits exactly on it
+    assert stats["raw_deleted"] == 29
+    assert stats["hourly_buckets"] == 29
+    assert len(db.get_trend_history("AI Summit", days=10)) == 10
+
+
+def test_backfilled_snapshots_keep_their_computed_at_out_of_order(db):
+    db.insert_trend_snapshots([
+        {'topic': 'Alpha', 'trend_score': 0.9, 'computed_at': '2026-03-02T08:00:00Z'},
+        {'topic': 'Alpha', 'trend_score': 0.2, 'computed_at': '2026-03-01 08:00:00'},
+        {'topic': 'Beta', 'trend_score': 0.5},
+    ])
+
+    latest = db.get_trend_by_topic('Alpha')
+    assert (latest.trend_score, latest.computed_at) == (0.9, '2026-03-02 08:00:00')
+    assert db.get_trend_by_topic('Beta').computed_at > '2026-03-02 08:00:00'
+    assert [trend.topic for trend in db.get_trend_snapshots()] == ['Beta', 'Alpha']
+
+
+def test_get_trends_by_topics_chunks_large_topic_lists(db):
+    topics = [f"Topic {index}" for index in range(db.MAX_QUERY_PARAMS * 2 + 5)]
+    db.insert_trend_snapshots(
+        {'topic': topic, 'computed_at': db.epoch_to_timestamp(1767225600 + index * 60)}
+        for index, topic in enumerate(topics)
+    )
+
+    trends = db.get_trends_by_topics(topics, limit=len(topics))
+
+    assert [trend.topic for trend in trends] == topics[::-1]
+    assert [trend.topic for trend in db.get_trends_by_topics(topics, limit=3)] == topics[:-4:-1]
@@ -0,0 +1,77 @@
+"""Tests for the domain classifier and its classification cache"""
+
+import pytest
+
+import domain_classifier
+from domain_classifier import ClassificationCache
+
+
+@pytest.fixture
+def classifier(db):
+    """Classifier with an empty cache, persisting to the temporary database"""
+    domain_classifier.clear_classification_cache()
+    yield domain_classifier
+    # Recompile whatever rules the test patched back to the originals
+    domain_classifier.reload_rules()
+    domain_classifier.clear_classification_cache()
+
+
+def _persisted(db):
+    with db.get_db() as conn:
+        return {row[0]: row[1] for row in conn.execute("SELECT topic, rules_version FROM topic_domain")}
+
+
+def test_cache_counts_hits_and_misses_and_evicts_least_recently_used():
+    cache = ClassificationCache(maxsize=2)
+    cache.put("a", ("Sports", 0.4))
+    cache.put("b", ("Politics", 0.4))
+
+    assert cache.get("a") == ("Sports", 0.4)
+    cache.put("c", ("Lifestyle", 0.4))
+
+    assert cache.get("b") is None
+    assert cache.get("c") == ("Lifestyle", 0.4)
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1, "hit_rate": 0.6667}
+
+
+def test_classify_topic_counts_cache_hits_on_normalized_topics(classifier):
+    first = classifier.classify_topic("NBA Playoff")
+    second = classifier.classify_topic("  nba playoff ")
+
+    assert first == second == ("Sports", 0.7)
+    stats = classifier.get_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_classify_topic_does_not_write_to_the_database(db, classifier):
+    classifier.classify_topic("Bitcoin Rally")
+
+    assert _persisted(db) == {}
+
+
+def test_classify_batch_persists_misses_and_warms_a_cleared_cache(db, classifier):
+    classifier.classify_batch(["Bitcoin Rally", "Bitcoin Rally", "Oscar Night"])
+
+    assert _persisted(db) == {
+        "bitcoin rally": classifier.RULES_VERSION,
+        "oscar night": classifier.RULES_VERSION
+    }
+
+    classifier.clear_classification_cache()
+    classifier.classify_batch(["Oscar Night"])
+    assert classifier.get_cache_stats()["hits"] == 1
+
+
+def test_reload_rules_invalidates_cached_and_persisted_classifications(db, classifier, monkeypatch):
+    classifier.classify_batch(["Zorblax Finals"])
+    assert classifier.classify_topic("Zorblax Finals") == ("Other", 0.0)
+    old_version = classifier.RULES_VERSION
+
+    assert classifier.reload_rules() is False
+    monkeypatch.setitem(classifier.SPECIAL_CASES, "zorblax", "Sports")
+    assert classifier.reload_rules() is True
+
+    assert classifier.RULES_VERSION != old_version
+    assert classifier.get_cache_stats()["size"] == 0
+    assert _persisted(db) == {}
+    assert classifier.classify_topic("Zorblax Finals") == ("Sports", 1.0)
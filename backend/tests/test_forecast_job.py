@@ -0,0 +1,119 @@
+"""Tests that incremental forecasts match refitting the history window"""
+
+import random
+import time
+
+import pytest
+
+import database
+import forecast_job
+from ml.predictor import ProcessPoolTrendPredictor
+
+
+def _populate(db, topics, seed=0):
+    """Noisy linear histories; some topics stopped reporting days or weeks ago"""
+    rng = random.Random(seed)
+    now = int(time.time())
+    points = []
+    for index in range(topics):
+        start, slope = rng.uniform(10, 90), rng.uniform(-1, 1)
+        # Quiet topics end up to 60 days ago, so parts or all of their history
+        # have aged out of the window without any new point arriving
+        end = now - rng.choice([0, 0, 2, 10, 29, 45, 60]) * 86400 - 3600
+        for day in range(rng.randint(0, 50)):
+            points.append({
+                'topic': f"Topic {index}",
+                'trend_score': max(0.0, min(100.0, start + slope * day + rng.gauss(0, 5))),
+                'recorded_at': database.epoch_to_timestamp(end - day * 86400 - rng.randint(0, 3000))
+            })
+    db.insert_trend_histories(points)
+    return [(f"Topic {index}", 'Other') for index in range(topics)]
+
+
+def _both_paths(topics):
+    names = [topic for topic, _ in topics]
+    incremental = forecast_job.build_forecasts_from_stats(topics, database.get_regression_stats(names))
+    series = database.get_trend_history_series(names, days=database.REGRESSION_WINDOW_DAYS)
+    refit = forecast_job.build_forecasts(
+        [(topic, domain, series[topic]) for topic, domain in topics], database.get_last_history_ts(names)
+    )
+    return incremental, refit
+
+
+def _assert_same(incremental, refit):
+    for left, right in zip(incremental, refit):
+        assert left == right, left['topic']
+
+
+def test_incremental_forecasts_match_refit(db):
+    topics = _populate(db, 300)
+
+    _assert_same(*_both_paths(topics))
+
+
+def test_incremental_forecasts_match_refit_after_deleting_newest_points(db):
+    topics = _populate(db, 100, seed=1)
+    with db.get_db() as conn:
+        # Every topic's newest point, then a few random ones
+        conn.execute("""
+            DELETE FROM trend_history WHERE id IN (
+                SELECT id FROM trend_history h
+                WHERE recorded_ts = (SELECT MAX(recorded_ts) FROM trend_history WHERE topic = h.topic)
+            )
+        """)
+        conn.execute("DELETE FROM trend_history WHERE id % 7 = 0")
+
+    _assert_same(*_both_paths(topics))
+
+    with db.get_db() as conn:
+        stored = {row['topic']: row['last_ts'] for row in conn.execute("SELECT topic, last_ts FROM trend_regression_stats")}
+        newest = {row[0]: row[1] for row in conn.execute("SELECT topic, MAX(recorded_ts) FROM trend_history GROUP BY topic")}
+    assert stored == newest
+
+
+@pytest.mark.parametrize("incremental", [True, False])
+def test_second_scan_without_new_history_refreshes_nothing(db, monkeypatch, incremental):
+    monkeypatch.setattr(forecast_job, "INCREMENTAL_FORECASTS", incremental)
+    topics = _populate(db, 50, seed=2)
+
+    assert forecast_job.refresh_stale_forecasts() > 0
+    # Quiet topics with no points left in the window still record their newest point
+    predictions = db.get_predictions([topic for topic, _ in topics])
+    assert any(row['data_points'] == 0 and row['history_until'] for row in predictions.values())
+    assert forecast_job.refresh_stale_forecasts() == 0
+
+    db.insert_trend_history("Topic 0", 42.0)
+    assert forecast_job.refresh_stale_forecasts() == 1
+
+
+def test_incremental_forecasts_match_refit_after_updating_and_moving_points(db):
+    topics = _populate(db, 100, seed=3)
+    with db.get_db() as conn:
+        conn.execute("UPDATE trend_history SET trend_score = 100 - trend_score WHERE id % 3 = 0")
+        # Newest points of some topics, and others moved between topics and back in time
+        conn.execute("""
+            UPDATE trend_history SET trend_score = 0 WHERE id IN (
+                SELECT id FROM trend_history h
+                WHERE recorded_ts = (SELECT MAX(recorded_ts) FROM trend_history WHERE topic = h.topic)
+            ) AND id % 2 = 0
+        """)
+        conn.execute("UPDATE trend_history SET topic = 'Topic 0' WHERE id % 11 = 0")
+        conn.execute("UPDATE trend_history SET recorded_ts = recorded_ts - 20 * 86400 WHERE id % 13 = 0")
+
+    _assert_same(*_both_paths(topics))
+
+
+def test_refits_through_worker_processes_match_incremental_forecasts(db, monkeypatch):
+    topics = _populate(db, 60, seed=5)
+    incremental = forecast_job.refresh_topics(topics)
+
+    predictor = ProcessPoolTrendPredictor(workers=2, min_topics_per_worker=16)
+    monkeypatch.setattr(forecast_job, "_predictor", predictor)
+    monkeypatch.setattr(forecast_job, "INCREMENTAL_FORECASTS", False)
+    try:
+        pooled = forecast_job.refresh_topics(topics)
+        assert predictor._executor is not None
+    finally:
+        predictor.shutdown()
+
+    _assert_same(incremental, pooled)